@@ -0,0 +1,88 @@
+"""
+Keeps which profile is assigned to each controller in memory, so that looking up a
+controller's profile doesn't read the assignments file every time. The file is
+read again only if it was changed by something else.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Callable
+
+from .persist import write_atomic
+
+
+class AssignmentStore:
+    """The names of the profiles assigned to controllers, by controller name,
+    loaded from and saved to the JSON file at path. on_error is called with the
+    error if the file can't be read or written."""
+
+    def __init__(
+        self, path: str, on_error: Callable[[Exception], None] | None = None
+    ) -> None:
+        self.path = path
+        self.on_error = on_error
+        self.assignments: dict[str, str] = {}
+        # The modification time and size of the file when it was last read or
+        # written, or None if it hasn't been
+        self.version: tuple[int, int] | None = None
+
+    def get(self, controller: str) -> str | None:
+        """Returns the name of the profile assigned to the controller, if any."""
+        self.refresh()
+        return self.assignments.get(controller)
+
+    def get_all(self) -> dict[str, str]:
+        """Returns a copy of all assignments."""
+        self.refresh()
+        return dict(self.assignments)
+
+    def set(self, controller: str, profile: str) -> None:
+        """Assigns the profile to the controller, or unassigns the controller's
+        profile if profile is empty, saving the change."""
+        self.refresh()
+        if profile:
+            if self.assignments.get(controller) == profile:
+                return
+            self.assignments[controller] = profile
+        elif self.assignments.pop(controller, None) is None:
+            return
+        try:
+            write_atomic(self.path, json.dumps(self.assignments))
+        except OSError as err:
+            self.error(err)
+            return
+        self.version = self.stat()
+
+    def refresh(self) -> None:
+        """Reads the file again if it has changed since it was last read or
+        written."""
+        version = self.stat()
+        if version == self.version:
+            return
+        self.version = version
+        try:
+            with open(self.path, "r", encoding="utf8") as file:
+                assignments = json.load(file)
+            if not isinstance(assignments, dict):
+                raise ValueError(f"Expected an object in '{self.path}'")
+        except (OSError, ValueError) as err:
+            self.error(err)
+            assignments = {}
+        self.assignments = assignments
+
+    def stat(self) -> tuple[int, int] | None:
+        """Returns the modification time and size of the file, if it exists."""
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def error(self, err: Exception) -> None:
+        """Passes an error to on_error."""
+        if self.on_error is not None:
+            self.on_error(err)
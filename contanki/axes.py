@@ -0,0 +1,140 @@
+"""
+Turns stick positions into cursor and scroll movement. The routing of axes to the
+cursor and scrolling, inversion, deadzone and response curves are compiled for each
+profile, and applied in one step.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+TARGETS = (
+    "Cursor Horizontal",
+    "Cursor Vertical",
+    "Scroll Horizontal",
+    "Scroll Vertical",
+)
+
+
+def quad_curve(value: float, factor: int = 5) -> float:
+    """Used to calculate cursor and scroll acceleration."""
+    return ((value * factor) ** 2) * value
+
+
+def _compile_sum(route: list[tuple[int, float]]) -> Callable[[Sequence[float]], float]:
+    """Compiles a route into a function which adds up its axes."""
+    if not route:
+        return lambda axes: 0.0
+    if len(route) == 1:
+        axis, sign = route[0]
+        return lambda axes: axes[axis] * sign
+
+    def add_axes(axes: Sequence[float]) -> float:
+        total = 0.0
+        for axis, sign in route:
+            total += axes[axis] * sign
+        return total
+
+    return add_axes
+
+
+Router = Callable[[Sequence[float]], tuple[float, float, float, float]]
+
+
+def compile_router(routes: list[list[tuple[int, float]]]) -> Router:
+    """
+    Compiles routes into a function which adds up the axes for each target. The
+    axes and signs of each target are bound into closures, which is an order of
+    magnitude faster than looping over the routes on each poll. When each target has
+    at most one axis, as for nearly every profile, they are read in one function.
+    """
+    if any(len(route) > 1 for route in routes):
+        sum_0, sum_1, sum_2, sum_3 = [_compile_sum(route) for route in routes]
+
+        def add_routes(axes: Sequence[float]) -> tuple[float, float, float, float]:
+            return sum_0(axes), sum_1(axes), sum_2(axes), sum_3(axes)
+
+        return add_routes
+
+    if not any(routes):
+        return lambda axes: (0.0, 0.0, 0.0, 0.0)
+    # Targets without an axis read axis 0, which exists if any target has an axis,
+    # multiplied by 0
+    (axis_0, sign_0), (axis_1, sign_1), (axis_2, sign_2), (axis_3, sign_3) = [
+        route[0] if route else (0, 0.0) for route in routes
+    ]
+
+    def route_axes(axes: Sequence[float]) -> tuple[float, float, float, float]:
+        return (
+            axes[axis_0] * sign_0,
+            axes[axis_1] * sign_1,
+            axes[axis_2] * sign_2,
+            axes[axis_3] * sign_3,
+        )
+
+    return route_axes
+
+
+class AxisPipeline:
+    """Routes the axes of a controller to cursor and scroll movement."""
+
+    def __init__(
+        self,
+        axes_bindings: dict[int, str],
+        invert_axis: dict[int, bool],
+        num_axes: int,
+        config: dict[str, Any],
+    ) -> None:
+        self.axes_bindings = axes_bindings
+        self.invert_axis = invert_axis
+        self.cursor_speed = config["Cursor Speed"] / 2
+        self.cursor_power = config["Cursor Acceleration"] / 5 + 1
+        self.scroll_speed = config["Scroll Speed"] / 10
+        self.deadzone = config["Stick Deadzone"] / 100
+        self.compile(num_axes)
+
+    def compile(self, num_axes: int) -> None:
+        """Prepares the routing for a controller with num_axes axes."""
+        self.num_axes = num_axes
+        self.button_axes = [
+            axis
+            for axis in range(num_axes)
+            if self.axes_bindings.get(axis) == "Buttons"
+        ]
+        # The axes, with their sign, which add up to each target
+        self.routes: list[list[tuple[int, float]]] = [[] for _ in TARGETS]
+        for axis in range(num_axes):
+            action = self.axes_bindings.get(axis)
+            if action in TARGETS:
+                sign = -1.0 if self.invert_axis.get(axis) else 1.0
+                self.routes[TARGETS.index(action)].append((axis, sign))
+        self.router = compile_router(self.routes)
+
+    def route(self, axes: Sequence[float]) -> tuple[float, float, float, float]:
+        """Returns the cursor and scroll deflection, before deadzone and curves."""
+        if len(axes) != self.num_axes:
+            self.compile(len(axes))
+        return self.router(axes)
+
+    def process(
+        self, axes: list[float]
+    ) -> tuple[tuple[float, float] | None, tuple[float, float] | None]:
+        """Returns the cursor movement in pixels and the amount to scroll, or None
+        for either when its stick is within the deadzone."""
+        cursor_x, cursor_y, scroll_x, scroll_y = self.route(axes)
+        return self.cursor(cursor_x, cursor_y), self.scroll(scroll_x, scroll_y)
+
+    def cursor(self, x: float, y: float) -> tuple[float, float] | None:
+        """Applies the deadzone and acceleration curve to cursor deflection."""
+        if abs(x) + abs(y) < self.deadzone:
+            return None
+        speed, power = self.cursor_speed, self.cursor_power
+        return (abs(x) * speed) ** power * x, (abs(y) * speed) ** power * y
+
+    def scroll(self, x: float, y: float) -> tuple[float, float] | None:
+        """Applies the deadzone and curve to scroll deflection."""
+        if abs(x) + abs(y) < self.deadzone:
+            return None
+        return quad_curve(x * self.scroll_speed), quad_curve(y * self.scroll_speed)
@@ -0,0 +1,453 @@
+"""
+Input backends read controllers and pass their state to Contanki.
+
+The default backend runs controller.js in Contanki's webview and uses the Gamepad
+API. On Linux, the native backend reads controllers through evdev in a background
+thread, avoiding Chromium's polling and the string messages entirely. The daemon
+backend reads the state written to shared memory by input_daemon.py, so that
+device I/O happens in another process.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+import select
+import sys
+import threading
+from functools import partial
+from time import monotonic
+from typing import Any, Callable
+
+try:
+    import evdev  # pylint: disable=import-error
+except ImportError:
+    evdev = None
+
+from .ringbuffer import CONNECT, DISCONNECT, STATE, RingReader, default_ring_path
+from .utils import dbg, get_file
+
+
+class InputBackend:
+    """
+    Reads controllers and calls the target's on_connect, on_disconnect,
+    register_controllers, and poll_inputs methods.
+    """
+
+    def __init__(self, target: Any) -> None:
+        self.target = target
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the backend can be used on this system."""
+        return True
+
+    def start(self) -> None:
+        """Starts looking for controllers."""
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        """Stops reading controllers."""
+        raise NotImplementedError
+
+    def connect(self, index: int) -> None:
+        """Connects to one of the controllers passed to register_controllers."""
+        raise NotImplementedError
+
+    def reconnect(self) -> None:
+        """Drops the current controller and looks for controllers again."""
+        raise NotImplementedError
+
+    def update_config(self, config: dict[str, Any]) -> None:
+        """Applies changes to the add-on config."""
+
+    def get_controller_info(self, callback: Callable[[list[list[str]]], None]) -> None:
+        """Calls callback with the ID, number of buttons and number of axes of each
+        detected controller."""
+        raise NotImplementedError
+
+
+class WebViewBackend(InputBackend):
+    """Reads controllers with the Gamepad API. The target must be an AnkiWebView."""
+
+    def __init__(self, target: Any) -> None:
+        super().__init__(target)
+        script = get_file("controller.js")
+        if script is None:
+            raise FileNotFoundError("controller.js not found")
+        self.script = script
+        self.config: dict[str, Any] = {}
+        self.started = False
+
+    def start(self) -> None:
+        self.started = True
+        self.target.stdHtml(
+            f"""<script type="text/javascript">\n{self.script}\n"""
+            f"""{self.poll_config_js()}\n</script>"""
+        )
+
+    def stop(self) -> None:
+        # Necessary to prevent crash when Anki exits
+        self.started = False
+        self.target.stdHtml("")
+
+    def connect(self, index: int) -> None:
+        self.target.eval(f"connect_controller(indices[{index}]);")
+
+    def reconnect(self) -> None:
+        self.target.eval("on_controller_disconnect()")
+
+    def update_config(self, config: dict[str, Any]) -> None:
+        self.config = config
+        if self.started:
+            self.target.eval(self.poll_config_js())
+
+    def poll_config_js(self) -> str:
+        """Returns JavaScript which passes the polling options to controller.js"""
+        if not self.config:
+            return ""
+        return (
+            f"set_poll_config({int(self.config['Active Poll Interval'])}, "
+            f"{int(self.config['Idle Poll Interval'])}, "
+            f"{int(self.config['Idle Delay'])}, "
+            f"{self.config['Stick Deadzone'] / 100});"
+        )
+
+    def get_controller_info(self, callback: Callable[[list[list[str]]], None]) -> None:
+        def _callback(controllers: str | None) -> None:
+            if controllers is None:
+                callback([])
+            else:
+                callback([con.split("%") for con in controllers.split("%%%") if con])
+
+        self.target.evalWithCallback("get_controller_info()", _callback)
+
+
+# Linux input event codes, from linux/input-event-codes.h
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+SYN_REPORT = 0
+ABS_X, ABS_Y, ABS_Z, ABS_RX, ABS_RY, ABS_RZ = 0x00, 0x01, 0x02, 0x03, 0x04, 0x05
+ABS_HAT0X, ABS_HAT0Y = 0x10, 0x11
+BTN_GAMEPAD = BTN_SOUTH = 0x130
+BTN_EAST, BTN_NORTH, BTN_WEST = 0x131, 0x133, 0x134
+BTN_TL, BTN_TR, BTN_TL2, BTN_TR2 = 0x136, 0x137, 0x138, 0x139
+BTN_SELECT, BTN_START, BTN_MODE = 0x13A, 0x13B, 0x13C
+BTN_THUMBL, BTN_THUMBR = 0x13D, 0x13E
+BTN_DPAD_UP, BTN_DPAD_DOWN, BTN_DPAD_LEFT, BTN_DPAD_RIGHT = 0x220, 0x221, 0x222, 0x223
+
+# Maps evdev codes to the button indices of the standard gamepad layout, which is
+# what the Gamepad API reports and what the built-in profiles expect.
+STANDARD_BUTTONS = {
+    BTN_SOUTH: 0,
+    BTN_EAST: 1,
+    BTN_WEST: 2,
+    BTN_NORTH: 3,
+    BTN_TL: 4,
+    BTN_TR: 5,
+    BTN_TL2: 6,
+    BTN_TR2: 7,
+    BTN_SELECT: 8,
+    BTN_START: 9,
+    BTN_THUMBL: 10,
+    BTN_THUMBR: 11,
+    BTN_DPAD_UP: 12,
+    BTN_DPAD_DOWN: 13,
+    BTN_DPAD_LEFT: 14,
+    BTN_DPAD_RIGHT: 15,
+    BTN_MODE: 16,
+}
+STANDARD_AXES = {ABS_X: 0, ABS_Y: 1, ABS_RX: 2, ABS_RY: 3}
+# Analog triggers are reported as buttons, as the Gamepad API does
+TRIGGER_AXES = {ABS_Z: 6, ABS_RZ: 7}
+HAT_AXES = {ABS_HAT0X: (14, 15), ABS_HAT0Y: (12, 13)}
+NUM_BUTTONS, NUM_AXES = 17, 4
+
+
+class EvdevMapping:
+    """Translates evdev events into a standard gamepad state."""
+
+    def __init__(self, abs_ranges: dict[int, tuple[int, int]]) -> None:
+        self.abs_ranges = abs_ranges
+        self.buttons = [False] * NUM_BUTTONS
+        self.axes = [0.0] * NUM_AXES
+        self.changed = False
+
+    def is_active(self) -> bool:
+        """Whether any button is held or any stick deflected."""
+        return any(self.buttons) or any(abs(axis) > 0.05 for axis in self.axes)
+
+    def normalise(self, code: int, value: int) -> float:
+        """Scales an absolute axis value to between -1 and 1."""
+        low, high = self.abs_ranges.get(code, (-1, 1))
+        if high == low:
+            return 0.0
+        return max(-1.0, min(1.0, (value - low) * 2 / (high - low) - 1))
+
+    def handle_event(self, ev_type: int, code: int, value: int) -> bool:
+        """Updates the state. Returns True at the end of a report which changed it."""
+        if ev_type == EV_KEY and code in STANDARD_BUTTONS:
+            self.set_button(STANDARD_BUTTONS[code], bool(value))
+        elif ev_type == EV_ABS:
+            if code in STANDARD_AXES:
+                axis = round(self.normalise(code, value), 4)
+                if abs(axis) < 0.01:
+                    axis = 0.0
+                if self.axes[STANDARD_AXES[code]] != axis:
+                    self.axes[STANDARD_AXES[code]] = axis
+                    self.changed = True
+            elif code in TRIGGER_AXES:
+                self.set_button(TRIGGER_AXES[code], self.normalise(code, value) > 0)
+            elif code in HAT_AXES:
+                negative, positive = HAT_AXES[code]
+                self.set_button(negative, value < 0)
+                self.set_button(positive, value > 0)
+        elif ev_type == EV_SYN and code == SYN_REPORT and self.changed:
+            self.changed = False
+            return True
+        return False
+
+    def set_button(self, index: int, pressed: bool) -> None:
+        """Sets the state of a button."""
+        if self.buttons[index] != pressed:
+            self.buttons[index] = pressed
+            self.changed = True
+
+
+def controller_id(name: str, vendor: int, product: int) -> str:
+    """Formats an ID in the same way as Chromium, for identify_controller."""
+    return f"{name} (STANDARD GAMEPAD Vendor: {vendor:04x} Product: {product:04x})"
+
+
+class EvdevBackend(InputBackend):
+    """
+    Reads controllers from /dev/input through evdev in a background thread. Calls
+    to the target are passed to post, which must run them on the main thread.
+    """
+
+    SCAN_INTERVAL = 2.0
+    ACTION_INTERVAL = 0.05
+
+    def __init__(self, target: Any, post: Callable[[Callable[[], None]], None]):
+        super().__init__(target)
+        self.post = post
+        self.devices: list[Any] = []
+        self.device: Any = None
+        self.thread: threading.Thread | None = None
+        self.running = threading.Event()
+        self.wake = threading.Event()
+
+    @staticmethod
+    def is_available() -> bool:
+        return sys.platform.startswith("linux") and evdev is not None
+
+    @staticmethod
+    def find_gamepads() -> list[Any]:
+        """Returns the input devices which look like gamepads."""
+        gamepads = []
+        for path in evdev.list_devices():
+            try:
+                device = evdev.InputDevice(path)
+            except OSError:
+                continue
+            keys = device.capabilities().get(EV_KEY, [])
+            if BTN_GAMEPAD in keys and EV_ABS in device.capabilities():
+                gamepads.append(device)
+            else:
+                device.close()
+        return gamepads
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.running.set()
+        self.thread = threading.Thread(target=self.run, name="contanki-evdev")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running.clear()
+        self.wake.set()
+        # The thread may be reading a device, so wait for it before closing them. It
+        # checks running at least every SCAN_INTERVAL.
+        if self.thread is not None:
+            self.thread.join()
+        self.thread = None
+        self.close_devices()
+
+    def connect(self, index: int) -> None:
+        if 0 <= index < len(self.devices):
+            self.device = self.devices[index]
+            self.wake.set()
+
+    def reconnect(self) -> None:
+        self.device = None
+        self.wake.set()
+
+    def get_controller_info(self, callback: Callable[[list[list[str]]], None]) -> None:
+        callback(
+            [
+                [self.get_id(device), str(NUM_BUTTONS), str(NUM_AXES)]
+                for device in self.devices
+            ]
+        )
+
+    @staticmethod
+    def get_id(device: Any) -> str:
+        """Returns the ID of a device."""
+        return controller_id(device.name, device.info.vendor, device.info.product)
+
+    def close_devices(self) -> None:
+        """Closes all open devices."""
+        for device in self.devices:
+            try:
+                device.close()
+            except OSError:
+                pass
+        self.devices = []
+        self.device = None
+
+    def scan(self) -> None:
+        """Looks for gamepads, and connects if there is only one."""
+        self.close_devices()
+        self.devices = self.find_gamepads()
+        if len(self.devices) == 1:
+            self.device = self.devices[0]
+        elif len(self.devices) > 1:
+            controllers = [
+                f"{self.get_id(device)}%%%{NUM_BUTTONS}%%%{NUM_AXES}"
+                for device in self.devices
+            ]
+            self.post(partial(self.target.register_controllers, *controllers))
+
+    def run(self) -> None:
+        """Main loop of the background thread."""
+        while self.running.is_set():
+            self.wake.clear()
+            if self.device is None:
+                self.scan()
+            if self.device is None:
+                self.wake.wait(self.SCAN_INTERVAL)
+                continue
+            try:
+                self.read_device(self.device)
+            except OSError as err:
+                dbg(f"evdev device lost: {err}")
+                self.device = None
+                self.post(partial(self.target.on_disconnect, str(err)))
+
+    def read_device(self, device: Any) -> None:
+        """Reads events from device until it is changed or the backend stops."""
+        abs_ranges = {
+            code: (info.min, info.max)
+            for code, info in device.capabilities().get(EV_ABS, [])
+        }
+        mapping = EvdevMapping(abs_ranges)
+        self.post(
+            partial(self.target.on_connect, NUM_BUTTONS, NUM_AXES, self.get_id(device))
+        )
+        self.post(
+            partial(
+                self.target.poll_inputs, mapping.buttons.copy(), mapping.axes.copy()
+            )
+        )
+        while self.running.is_set() and self.device is device:
+            # Held buttons and deflected sticks still need to act regularly
+            timeout = self.ACTION_INTERVAL if mapping.is_active() else 0.5
+            readable, _, _ = select.select([device.fd], [], [], timeout)
+            if not readable:
+                if mapping.is_active():
+                    self.post(self.target.heartbeat)
+                continue
+            try:
+                events = list(device.read())
+            except BlockingIOError:
+                # The device can be readable with no events left to read
+                continue
+            for event in events:
+                if mapping.handle_event(event.type, event.code, event.value):
+                    buttons, axes = mapping.buttons.copy(), mapping.axes.copy()
+                    self.post(partial(self.target.poll_inputs, buttons, axes))
+
+
+class DaemonBackend(InputBackend):
+    """
+    Reads controller state from the ring buffer written by input_daemon.py. The
+    buffer is read whenever timer, a QTimer, times out, so reads never block.
+    """
+
+    ACTION_INTERVAL = 0.05
+
+    def __init__(self, target: Any, timer: Any, path: str | None = None) -> None:
+        super().__init__(target)
+        self.timer = timer
+        self.reader = RingReader(path or default_ring_path())
+        self.controller: list[str] = []
+        self.active = False
+        self.last_active = 0.0
+        self.last_action = 0.0
+        self.config: dict[str, Any] = {}
+        self.timer.timeout.connect(self.read)
+
+    def start(self) -> None:
+        self.timer.start(self.get_interval())
+
+    def stop(self) -> None:
+        self.timer.stop()
+        self.reader.close()
+
+    def connect(self, index: int) -> None:
+        """The daemon chooses the controller."""
+
+    def reconnect(self) -> None:
+        self.target.on_disconnect("Reconnecting to input daemon")
+        # Reopening the buffer replays the connected controller
+        self.reader.close()
+
+    def update_config(self, config: dict[str, Any]) -> None:
+        self.config = config
+        self.timer.setInterval(self.get_interval())
+
+    def get_controller_info(self, callback: Callable[[list[list[str]]], None]) -> None:
+        callback([self.controller] if self.controller else [])
+
+    def get_interval(self) -> int:
+        """Returns the timer interval in ms, which is longer once input is idle."""
+        if not self.config:
+            return 8
+        idle = self.config["Idle Delay"] / 1000
+        if self.active or monotonic() - self.last_active < idle:
+            return int(self.config["Active Poll Interval"])
+        return int(self.config["Idle Poll Interval"])
+
+    def read(self) -> None:
+        """Passes new records to the target, in the order they were written."""
+        records = self.reader.read()
+        now = monotonic()
+        for record in records:
+            if record.kind == CONNECT:
+                self.controller = [
+                    record.name,
+                    str(record.num_buttons),
+                    str(record.num_axes),
+                ]
+                self.target.on_connect(record.num_buttons, record.num_axes, record.name)
+            elif record.kind == DISCONNECT:
+                self.controller = []
+                self.active = False
+                self.target.on_disconnect("Input daemon lost the controller")
+            elif record.kind == STATE:
+                axes = record.axis_list()
+                self.active = bool(record.buttons) or any(
+                    abs(axis) > 0.05 for axis in axes
+                )
+                self.last_action = now
+                self.target.poll_inputs(record.button_list(), axes)
+        if self.active:
+            self.last_active = now
+            # Held buttons and deflected sticks still need to act regularly
+            if not records and now - self.last_action >= self.ACTION_INTERVAL:
+                self.last_action = now
+                self.target.heartbeat()
+        interval = self.get_interval()
+        if self.timer.interval() != interval:
+            self.timer.setInterval(interval)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import platform
+import sys
+from time import strftime
+from typing import Callable
+from timeit import Timer
+
+from ..utils import get_file
+
+benchmarks: dict[str, Callable[[], dict[str, float]]] = {}
+
+
+def benchmark(_benchmark: Callable) -> Callable:
+    """Register a benchmark. Benchmarks return a dict of case names to timings."""
+    benchmarks[_benchmark.__name__] = _benchmark
+    return _benchmark
+
+
+def measure(func: Callable, number: int = 10000, repeat: int = 5) -> float:
+    """Returns the best time of a call to func in microseconds."""
+    return min(Timer(func).repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def controller_sizes() -> list[tuple[int, int]]:
+    """Returns the smallest, most common and largest number of buttons and axes of
+    the supported controllers in controllers.json."""
+    _file = get_file("controllers.json")
+    assert _file is not None
+    sizes = [
+        (len(controller["buttons"]), len(controller["axes"]))
+        for controller in json.loads(_file).values()
+        if controller["supported"]
+    ]
+    sizes.sort()
+    common = max(sizes, key=sizes.count)
+    return sorted({sizes[0], common, sizes[-1]})
+
+
+def run_benchmarks(output: str | None = None) -> dict[str, dict[str, float]]:
+    """Run all registered benchmarks, and optionally write the results as JSON."""
+    # pylint: disable=import-outside-toplevel,unused-import
+    from . import bench_inputs, bench_engine, bench_axes, bench_profile, bench_screens
+
+    print()
+    print(f"Running {len(benchmarks)} benchmark{'s' if len(benchmarks) > 1 else ''}...")
+    results = {}
+    for key, _benchmark in benchmarks.items():
+        print()
+        print(f"{key}:")
+        results[key] = _benchmark()
+        for case, timing in results[key].items():
+            print(f"\t{case}: {timing:.2f} µs")
+    print()
+    if output is not None:
+        with open(output, "w", encoding="utf8") as file:
+            json.dump(
+                {
+                    "time": strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "unit": "µs",
+                    "results": results,
+                },
+                file,
+                indent=4,
+                ensure_ascii=False,
+            )
+        print(f"Results written to {output}")
+    return results
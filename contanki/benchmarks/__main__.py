@@ -0,0 +1,20 @@
+"""
+Runs the benchmarks outside of Anki, e.g.
+    python contanki/benchmarks results.json
+"""
+
+import os
+import sys
+import types
+
+if not __package__ or __package__ == "__main__":
+    # Run as a script. Register the add-on as a bare package, as its __init__
+    # needs Anki.
+    _package = types.ModuleType("contanki")
+    _package.__path__ = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    sys.modules["contanki"] = _package
+
+# pylint: disable=wrong-import-position
+from contanki.benchmarks import run_benchmarks
+
+run_benchmarks(sys.argv[1] if len(sys.argv) > 1 else None)
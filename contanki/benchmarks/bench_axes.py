@@ -0,0 +1,22 @@
+# pylint: disable=missing-docstring
+
+from ..axes import AxisPipeline, TARGETS
+from . import benchmark, measure
+from .bench_engine import CONFIG
+
+# A gamepad, a Steam Deck-class device, and a flight controller setup
+AXIS_COUNTS = [4, 10, 32, 128]
+
+
+@benchmark
+def bench_axes():
+    results = {}
+    for num_axes in AXIS_COUNTS:
+        bindings = {axis: TARGETS[axis % len(TARGETS)] for axis in range(num_axes)}
+        invert = {axis: axis % 3 == 0 for axis in range(num_axes)}
+        axes = [0.6 if axis % 2 else -0.3 for axis in range(num_axes)]
+        pipeline = AxisPipeline(bindings, invert, num_axes, CONFIG)
+        results[f"{num_axes} axes"] = measure(
+            lambda pipeline=pipeline: pipeline.process(axes)
+        )
+    return results
@@ -0,0 +1,44 @@
+# pylint: disable=missing-docstring
+
+from ..engine import InputEngine
+from ..inputs import InputState
+from ..profile import get_profile
+from . import benchmark, controller_sizes, measure
+
+CONFIG = {
+    "Overlays Always On": False,
+    "Cursor Speed": 10,
+    "Cursor Acceleration": 10,
+    "Scroll Speed": 10,
+    "Stick Deadzone": 5,
+}
+
+
+def get_engine(num_buttons: int, num_axes: int) -> InputEngine:
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    engine = InputEngine()
+    engine.set_profile(profile, profile.quick_select)
+    engine.set_config(CONFIG, 0.05)
+    engine.reset(num_buttons, num_axes)
+    return engine
+
+
+@benchmark
+def bench_engine():
+    results = {}
+    for num_buttons, num_axes in controller_sizes():
+        size = f"{num_buttons} buttons {num_axes} axes"
+        engine = get_engine(num_buttons, num_axes)
+        inputs = InputState(0, num_buttons, [0.0] * num_axes)
+
+        def process():
+            # Alternate pressing and releasing a button, with the sticks still
+            inputs.set_button(1, not inputs.pressed(1))
+            engine.process("review", inputs, False, 0.0)
+
+        results[f"process, {size}"] = measure(process)
+
+        axes = [0.6 if i % 2 else -0.3 for i in range(num_axes)]
+        results[f"axes, {size}"] = measure(lambda: engine.axes_intents("review", axes))
+    return results
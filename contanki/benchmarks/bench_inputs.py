@@ -0,0 +1,50 @@
+# pylint: disable=missing-docstring
+
+from functools import partial
+
+from ..inputs import (
+    InputState,
+    pack_inputs,
+    parse_batch,
+    parse_packed_inputs,
+    parse_text_inputs,
+)
+from . import benchmark, controller_sizes, measure
+
+# A typical gamepad and a Steam Deck-class device, measured alongside the sizes of
+# the supported controllers
+SIZES = [(18, 4), (30, 10)]
+
+
+def sample_inputs(num_buttons: int, num_axes: int) -> tuple[list[bool], list[float]]:
+    buttons = [i % 5 == 0 for i in range(num_buttons)]
+    axes = [round((i % 3 - 1) * 0.37, 2) for i in range(num_axes)]
+    return buttons, axes
+
+
+@benchmark
+def bench_wire_formats():
+    results = {}
+    for num_buttons, num_axes in sorted(set(SIZES + controller_sizes())):
+        buttons, axes = sample_inputs(num_buttons, num_axes)
+        text = (
+            ",".join("true" if button else "false" for button in buttons),
+            ",".join(str(axis) for axis in axes),
+        )
+        packed = pack_inputs(buttons, axes)
+        size = f"{num_buttons} buttons {num_axes} axes"
+        results[f"text, {size}"] = measure(partial(parse_text_inputs, *text))
+        results[f"packed, {size}"] = measure(
+            partial(parse_packed_inputs, *packed, num_buttons)
+        )
+        results[f"packed to InputState, {size}"] = measure(
+            partial(InputState.from_packed, *packed, num_buttons)
+        )
+    # A typical batch: a button pressed and released while a stick moves
+    frames = "|".join(
+        f"{1690000000000 + i * 8}.5;{'0:1' if i == 1 else '0:0' if i == 3 else ''};"
+        f"2:{i / 10},3:-{i / 10}"
+        for i in range(4)
+    )
+    results["batch, 4 frames"] = measure(partial(parse_batch, frames))
+    return results
@@ -0,0 +1,67 @@
+# pylint: disable=missing-docstring
+
+from __future__ import annotations
+
+from functools import partial
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from ..catalog import ProfileCatalog
+from ..controller import identify_controller
+from ..profile import _find_profile, _read_profile, get_profile, profile_is_valid
+from ..utils import default_profile_path, user_profile_path
+from . import benchmark, measure
+
+PROFILE = "Standard Gamepad (16 Buttons 4 Axes)"
+
+CONTROLLER_IDS = {
+    "DualShock 4": (
+        "Wireless Controller (STANDARD GAMEPAD Vendor: 054c Product: 09cc)",
+        18,
+        4,
+    ),
+    "Xbox 360": ("Xbox 360 Controller (XInput STANDARD GAMEPAD)", 17, 4),
+    "unknown": ("Generic USB Joystick (Vendor: 0000 Product: 0000)", 12, 4),
+}
+
+
+def describe(path: str) -> tuple[str, str, tuple[int, int]] | None:
+    profile = _read_profile(path)
+    if profile is None:
+        return None
+    return profile.name, str(profile.controller), profile.size
+
+
+@benchmark
+def bench_profile():
+    # The benchmarks may run while Contanki is running, so they use a catalog of
+    # their own and don't change the cached profiles
+    profile = get_profile(PROFILE)
+    path = _find_profile(PROFILE)
+    assert profile is not None and path is not None
+    results = {
+        # Bound in the state, inherited from review, and inherited from all
+        "get, bound": measure(partial(profile.get, "question", 0), number=100000),
+        "get, review": measure(partial(profile.get, "question", 14), number=100000),
+        "get, all": measure(partial(profile.get, "question", 4), number=100000),
+        "get_profile": measure(partial(get_profile, PROFILE), number=100),
+        "get_profile, uncached": measure(partial(_read_profile, path), number=100),
+        "profile_is_valid": measure(
+            partial(profile_is_valid, profile.to_dict()), number=1000
+        ),
+    }
+    with TemporaryDirectory() as directory:
+        catalog = ProfileCatalog(
+            join(directory, "profile_catalog.json"),
+            [user_profile_path, default_profile_path],
+            describe,
+        )
+        results["list profiles"] = measure(catalog.profiles, number=100)
+        results["list profiles, rescanned"] = measure(
+            lambda: catalog.invalidate() or catalog.profiles(), number=100
+        )
+    for name, args in CONTROLLER_IDS.items():
+        results[f"identify_controller, {name}"] = measure(
+            partial(identify_controller, *args), number=100
+        )
+    return results
@@ -0,0 +1,25 @@
+# pylint: disable=missing-docstring
+
+from functools import partial
+
+from ..screens import ScreenTopology
+from . import benchmark, measure
+
+SCREEN = (1920, 1080)
+
+
+@benchmark
+def bench_screens():
+    results = {}
+    for count in (1, 2, 4):
+        width, height = SCREEN
+        topology = ScreenTopology([(i * width, 0, width, height) for i in range(count)])
+        # The cursor on the last screen, moving within it and off its edge
+        x = (count - 1) * width + 100
+        results[f"move, {count} screens"] = measure(
+            partial(topology.move, x, 500, 3.5, -2.0)
+        )
+        results[f"move off screen, {count} screens"] = measure(
+            partial(topology.move, x, 500, 0.0, 1000.0)
+        )
+    return results
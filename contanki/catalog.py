@@ -0,0 +1,181 @@
+"""
+Keeps an index of the profile files, saved to disk, so that listing and finding
+profiles doesn't have to load every profile. The index is only rebuilt when the
+contents of the profile directories change, and then only files which changed are
+read again.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from hashlib import sha1
+import json
+import os
+from typing import Any, Callable
+
+from .persist import write_atomic
+
+CATALOG_VERSION = 1
+
+
+def _stamp(directory: str) -> int:
+    """Returns the modification time of a directory, which changes when files are
+    added, removed or replaced."""
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _hash_file(path: str) -> str | None:
+    """Returns the SHA-1 hash of a file's contents."""
+    try:
+        with open(path, "rb") as file:
+            return sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class ProfileCatalog:
+    """
+    An index of the profile files in directories, in order of precedence, saved to
+    path. Each entry has the name, slug, path, controller and size of a profile, and
+    the modification time, length and SHA-1 hash of its file. describe is passed the
+    path of a file which isn't in the index and returns its name, controller and
+    size, or None if it isn't a valid profile. Invalid files are kept in the index
+    with no name, so they aren't read again until they change.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        directories: list[str],
+        describe: Callable[[str], tuple[str, str, tuple[int, int]] | None],
+    ) -> None:
+        self.path = path
+        self.directories = directories
+        self.describe = describe
+        self.stamps: list[int] | None = None
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.names: dict[str, dict[str, Any]] = {}
+        self.loaded = False
+
+    def profiles(self, directory: str | None = None) -> list[dict[str, Any]]:
+        """Returns the entries of the valid profiles, optionally only those in one
+        directory."""
+        self.refresh()
+        return [
+            entry
+            for entry in self.entries.values()
+            if entry["name"] is not None
+            and (directory is None or os.path.dirname(entry["path"]) == directory)
+        ]
+
+    def find(self, name: str) -> dict[str, Any] | None:
+        """Returns the entry of the profile with the name, if there is one."""
+        self.refresh()
+        return self.names.get(name)
+
+    def invalidate(self) -> None:
+        """Checks the files again the next time the catalog is used, e.g. after a
+        profile is saved or deleted."""
+        self.stamps = None
+
+    def refresh(self) -> None:
+        """Rebuilds the index if the contents of the directories have changed."""
+        if not self.loaded:
+            self.load()
+        stamps = [_stamp(directory) for directory in self.directories]
+        if stamps == self.stamps:
+            return
+        self.rebuild()
+        self.stamps = stamps
+        self.save()
+
+    def load(self) -> None:
+        """Loads the index saved by the last session."""
+        self.loaded = True
+        try:
+            with open(self.path, "r", encoding="utf8") as file:
+                data = json.load(file)
+            if data["version"] != CATALOG_VERSION:
+                return
+            self.entries = {entry["path"]: entry for entry in data["profiles"]}
+            self.stamps = data["stamps"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+            self.stamps = None
+        self.index_names()
+
+    def save(self) -> None:
+        """Saves the index, for the next session."""
+        data = {
+            "version": CATALOG_VERSION,
+            "stamps": self.stamps,
+            "profiles": list(self.entries.values()),
+        }
+        try:
+            write_atomic(self.path, json.dumps(data, indent=1))
+        except OSError:
+            pass
+
+    def rebuild(self) -> None:
+        """Reads the files which have changed since they were indexed, and drops
+        those which have gone."""
+        old_entries = self.entries
+        by_hash = {entry["hash"]: entry for entry in old_entries.values()}
+        entries = {}
+        for directory in self.directories:
+            try:
+                files = sorted(os.scandir(directory), key=lambda file: file.name)
+            except OSError:
+                continue
+            for file in files:
+                if file.name == "placeholder" or file.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat_result = file.stat()
+                except OSError:
+                    continue
+                if not file.is_file():
+                    continue
+                mtime, length = stat_result.st_mtime_ns, stat_result.st_size
+                entry = old_entries.get(file.path)
+                if entry and entry["mtime"] == mtime and entry["length"] == length:
+                    entries[file.path] = entry
+                    continue
+                entry = self.read_entry(file.path, file.name, by_hash)
+                entry["mtime"], entry["length"] = mtime, length
+                entries[file.path] = entry
+                by_hash.setdefault(entry["hash"], entry)
+        self.entries = entries
+        self.index_names()
+
+    def read_entry(
+        self, path: str, slug: str, by_hash: dict[str, dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Returns a new entry for a file, reusing an entry with the same contents,
+        e.g. for a file which was only touched or moved."""
+        content_hash = _hash_file(path)
+        known = by_hash.get(content_hash) if content_hash is not None else None
+        if known is not None:
+            return dict(known, path=path, slug=slug)
+        description = self.describe(path)
+        name, controller, size = description or (None, None, None)
+        return {
+            "name": name,
+            "slug": slug,
+            "path": path,
+            "controller": controller,
+            "size": list(size) if size is not None else None,
+            "hash": content_hash,
+        }
+
+    def index_names(self) -> None:
+        """Indexes the entries by name, with earlier directories taking precedence."""
+        names: dict[str, dict[str, Any]] = {}
+        for entry in self.entries.values():
+            if entry["name"] is not None:
+                names.setdefault(entry["name"], entry)
+        self.names = names
@@ -68,6 +68,9 @@ states: dict[State, str] = {
     "dialog": "Dialogs",
 }
 
+# Options in milliseconds, which need more room than the other numeric options
+POLL_TIMINGS = ("Active Poll Interval", "Idle Poll Interval", "Idle Delay")
+
 
 class ContankiConfig(QDialog):
     """Contanki's config dialog.
@@ -264,6 +267,8 @@ class OptionsPage(QWidget):
             elif isinstance(value, int):
                 widget = QSpinBox(self)
                 widget.setMinimumWidth(45)
+                if key in POLL_TIMINGS:
+                    widget.setMaximum(10000)  # poll timings are in milliseconds
                 widget.setValue(value)
             else:
                 continue
@@ -467,7 +472,7 @@ class OptionsPage(QWidget):
             self._change_profile(self.profile)
 
         def save_all(self) -> None:
-            """Saves all profiles."""
+            """Saves the profiles which have changed, in the background."""
             for profile in self.profiles:
                 profile.save()
 
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
+import os
+from concurrent.futures import Future
 from functools import partial
+from time import monotonic, strftime, time
 from typing import Any, Callable
-from collections import defaultdict
 
 from aqt import gui_hooks
-from aqt.qt import QAction, qconnect
+from aqt.qt import QAction, QFileDialog, QTimer, qconnect
 from aqt.utils import current_window, tooltip
-from aqt.webview import AnkiWebView
+from aqt.webview import AnkiWebView, WebContent
 
 from .quick import QuickSelectMenu
 from .icons import IconHighlighter
@@ -18,11 +20,34 @@ from .funcs import (
     get_config,
     get_custom_actions,
     get_state,
-    move_mouse_build,
-    scroll_build,
+    move_cursor_build,
+    start_screen_tracking,
+    start_state_tracking,
 )
-from .utils import State, get_file, DEBUG, dbg
+from .utils import State, DEBUG, dbg, get_file, user_files_path, user_traces_path
 from .overlay import ControlsOverlay
+from .inputs import InputState, parse_batch, parse_text_inputs
+from .engine import (
+    STEP_INTERVAL,
+    InputEngine,
+    Intent,
+    Press,
+    Release,
+    MoveCursor,
+    Scroll,
+    ShowOverlay,
+    Highlight,
+    QuickSelectDpad,
+    QuickSelectStick,
+    QuickSelectClose,
+)
+from .trace import TraceRecorder, TraceReplayer, read_trace
+from .latency import LatencyMonitor
+from .executor import ActionExecutor
+from .repeat import RepeatEngine, get_repeat
+from .cursor import CursorIntegrator
+from .scroll import SmoothScroller
+from .backends import InputBackend, DaemonBackend, EvdevBackend, WebViewBackend
 from .controller import identify_controller
 from .profile import (
     Profile,
@@ -36,8 +61,7 @@ from aqt import mw as _mw
 assert _mw is not None
 mw = _mw
 
-move_mouse = move_mouse_build()
-scroll = scroll_build()
+move_cursor = move_cursor_build()
 
 
 class Contanki(AnkiWebView):
@@ -49,20 +73,24 @@ class Contanki(AnkiWebView):
     config = get_config()
     overlay: ControlsOverlay | None = None
     quick_select = QuickSelectMenu(None, {})
-    buttons: list[bool] = []
-    axes: list[bool] = []
+    engine = InputEngine()
+    inputs: InputState | None = None
     len_buttons = 0
     len_axes = 0
     icons = IconHighlighter()
     controllers: list[QAction] = list()
     debug_info: list[list[str]] = []
     custom_actions = get_custom_actions()
-    _script = get_file("controller.js")
-    if _script is None:
-        raise FileNotFoundError("controller.js not found")
-    script = _script
-    scroll_up = False
-    scroll_down = False
+    # Functions for each action, with built in actions taking priority
+    handlers: dict[str, Callable[[], Any]] = {}
+    recorder: TraceRecorder | None = None
+    latency = LatencyMonitor()
+    # Epoch times in ms of the current input's sample, its message being received,
+    # and its processing starting, for measuring latency
+    sample_time = 0.0
+    receive_time = 0.0
+    process_time = 0.0
+    replayer: TraceReplayer | None = None
 
     def __init__(self, parent):
         super().__init__(parent=parent)
@@ -72,6 +100,23 @@ class Contanki(AnkiWebView):
         gui_hooks.webview_did_receive_js_message.append(self.on_receive_message)
         gui_hooks.profile_will_close.append(self.suspend)
         gui_hooks.profile_did_open.append(self.resume)
+        start_state_tracking()
+        start_screen_tracking()
+        # Actions run from the event loop, so that slow ones don't delay the next poll
+        self.executor = ActionExecutor(
+            partial(QTimer.singleShot, 0), lambda err: tooltip("Error: " + repr(err))
+        )
+        self.repeater = RepeatEngine(QTimer(self), self.repeat_action)
+        self.cursor_mover = CursorIntegrator(QTimer(self), self.move_cursor)
+        self.scroller = SmoothScroller(mw.web.eval)
+        gui_hooks.webview_will_set_content.append(self.inject_scroll_script)
+        if self.config["Input Daemon (Linux)"]:
+            self.backend: InputBackend = DaemonBackend(self, QTimer(self))
+        elif self.config["Native Input (Linux)"] and EvdevBackend.is_available():
+            self.backend = EvdevBackend(self, mw.taskman.run_on_main)
+        else:
+            self.backend = WebViewBackend(self)
+        self.backend.update_config(self.config)
         self.resume()
         self.profile = None
         self.update_debug_info()
@@ -80,6 +125,19 @@ class Contanki(AnkiWebView):
             self.mock_item = QAction("Mock Controller", mw)
             qconnect(self.mock_item.triggered, lambda: self.eval("mock_controller()"))
             mw.form.menuTools.addAction(self.mock_item)
+            self.benchmark_item = QAction("Run Contanki Benchmarks", mw)
+            qconnect(self.benchmark_item.triggered, self.run_benchmarks)
+            mw.form.menuTools.addAction(self.benchmark_item)
+            self.record_item = QAction("Record Input Trace", mw)
+            self.record_item.setCheckable(True)
+            qconnect(self.record_item.toggled, self.toggle_trace_recording)
+            mw.form.menuTools.addAction(self.record_item)
+            self.replay_item = QAction("Replay Input Trace", mw)
+            qconnect(self.replay_item.triggered, partial(self.replay_trace, False))
+            mw.form.menuTools.addAction(self.replay_item)
+            self.replay_fast_item = QAction("Replay Input Trace (Fast)", mw)
+            qconnect(self.replay_fast_item.triggered, partial(self.replay_trace, True))
+            mw.form.menuTools.addAction(self.replay_fast_item)
             self.setFixedSize(10, 10)
             from .tests import run_tests  # pylint: disable=import-outside-toplevel
 
@@ -88,12 +146,12 @@ class Contanki(AnkiWebView):
             self.setFixedSize(0, 0)
 
     def suspend(self):
-        """Suspends JS execution. Necessary to prevent crash when Anki exits."""
-        self.stdHtml("")
+        """Suspends the input backend. Necessary to prevent crash when Anki exits."""
+        self.backend.stop()
 
     def resume(self):
         """Resumes the add-on"""
-        self.stdHtml(f"""<script type="text/javascript">\n{self.script}\n</script>""")
+        self.backend.start()
 
     @property
     def profile(self) -> Profile | None:
@@ -104,10 +162,14 @@ class Contanki(AnkiWebView):
     def profile(self, profile: Profile | str | None) -> None:
         """Sets the profile object"""
         self.config = get_config()
+        self.backend.update_config(self.config)
         if isinstance(profile, str):
             profile = get_profile(profile)
         self._profile = profile
+        self.repeater.clear()
+        self.engine.set_config(self.config, SCROLL_FACTOR / 100)
         if profile is None:
+            self.engine.set_profile(None, {})
             return
         if self.overlay is not None:
             self.overlay.close()
@@ -116,10 +178,11 @@ class Contanki(AnkiWebView):
         self.overlay = ControlsOverlay(mw, profile)
         self.quick_select = QuickSelectMenu(self, profile.quick_select)
         self.quick_select.update_icon(profile.controller)
+        self.engine.set_profile(profile, self.quick_select.settings)
         update_actions()
-        globals()["move_mouse"] = move_mouse_build()
-        globals()["scroll"] = scroll_build()
+        globals()["move_cursor"] = move_cursor_build()
         self.custom_actions = get_custom_actions()
+        self.handlers = {**self.custom_actions, **button_actions}
 
     def on_config(self) -> None:
         """Opens the config dialog"""
@@ -134,24 +197,104 @@ class Contanki(AnkiWebView):
             "on_connect": self.on_connect,
             "on_disconnect": self.on_disconnect,
             "poll": self.poll,
+            "packed": self.poll_packed,
+            "batch": self.batch,
+            "heartbeat": self.heartbeat,
             "register": self.register_controllers,
             "initialise": lambda *args, **kwargs: None,
         }
 
         if message[:8] == "contanki":
+            if self.recorder is not None:
+                self.recorder.record(message)
+            self.receive_time = time() * 1000
+            self.sample_time = 0.0
             _, func, *args = message.split("::")
             if func == "message":
                 tooltip(str("::".join(args)))
             else:
                 funcs[func](*args)
+            self.receive_time = 0.0
             return (True, None)
         else:
             return handled
 
+    def run_benchmarks(self) -> None:
+        """Runs the benchmarks in the background, so that Anki stays responsive"""
+        # pylint: disable-next=import-outside-toplevel
+        from .benchmarks import run_benchmarks
+
+        results_path = os.path.join(user_files_path, "benchmark_results.json")
+
+        def on_done(future: Future) -> None:
+            try:
+                future.result()
+            except Exception as err:  # pylint: disable=broad-except
+                tooltip(f"Benchmarks failed: {err!r}")
+            else:
+                tooltip(f"Benchmark results written to {results_path}")
+
+        tooltip("Running benchmarks...")
+        mw.taskman.run_in_background(partial(run_benchmarks, results_path), on_done)
+
+    def toggle_trace_recording(self, record: bool) -> None:
+        """Starts or stops recording the messages received from controller.js"""
+        if record:
+            os.makedirs(user_traces_path, exist_ok=True)
+            path = os.path.join(user_traces_path, f"{strftime('%Y%m%d-%H%M%S')}.ctrace")
+            self.recorder = TraceRecorder(path)
+            # Reconnect so that the trace starts with the controller connecting
+            self.reset_controller()
+            self.connected = False
+            self.backend.reconnect()
+        elif self.recorder is not None:
+            self.recorder.close()
+            tooltip(f"Recorded {self.recorder.count} messages to {self.recorder.path}")
+            self.recorder = None
+
+    def replay_trace(self, fast: bool, *_) -> None:
+        """Replays a recorded trace, suspending the controller while it runs"""
+        path, _ = QFileDialog.getOpenFileName(
+            mw, "Replay Input Trace", user_traces_path, "Contanki Traces (*.ctrace)"
+        )
+        if not path:
+            return
+        try:
+            trace = read_trace(path)
+        except (OSError, ValueError) as err:
+            tooltip(f"Unable to read trace: {err}")
+            return
+        # Only stop a running replay once the new one can start, as stopping it
+        # leaves the backend suspended
+        if self.replayer is not None and self.replayer.running:
+            self.replayer.stop()
+
+        def send(message: str) -> None:
+            self.on_receive_message((False, None), message, None)
+
+        def on_finished() -> None:
+            self.reset_controller()
+            self.connected = False
+            self.resume()
+
+        self.suspend()
+        self.reset_controller()
+        self.connected = False
+        self.latency.reset()
+        self.replayer = TraceReplayer(trace, send, QTimer.singleShot, on_finished)
+        if fast:
+            elapsed = self.replayer.run_fast()
+            tooltip(
+                f"Replayed {len(trace)} messages in {elapsed * 1000:.0f} ms "
+                f"({len(trace) / max(elapsed, 1e-9):.0f} messages/s)"
+            )
+        else:
+            self.replayer.start_realtime()
+
     def on_error(self, _error: str) -> None:
         """Reinitialises the controller when an error occurs."""
         dbg(_error)
-        self.eval("on_controller_disconnect()")
+        self.backend.reconnect()
 
     def if_connected(func: Callable) -> Callable:  # pylint: disable=no-self-argument
         """Checks if the controller is connected before running a function."""
@@ -166,132 +309,118 @@ class Contanki(AnkiWebView):
 
         return if_connected_wrapper
 
-    @if_connected
     def poll(self, input_buttons: str, input_axes: str) -> None:
-        """Handles the polling of the controller"""
-        state = get_state()
-        if state == "NoFocus":
-            return
-
-        buttons, axes = self.parse_controller_inputs(input_buttons, input_axes)
+        """Handles a poll containing the full state of the controller"""
+        self.poll_state(
+            InputState.from_lists(*parse_text_inputs(input_buttons, input_axes))
+        )
 
-        if not buttons:
-            self.on_error("No buttons")
-            return
+    def poll_packed(self, input_buttons: str, input_axes: str) -> None:
+        """Handles a poll containing the full state of the controller, packed as a
+        button bitmask and base64 encoded axes"""
+        self.poll_state(
+            InputState.from_packed(input_buttons, input_axes, self.len_buttons)
+        )
 
-        if self.quick_select.is_shown:
-            self.update_quick_select(state, buttons, axes)
-            return
+    def poll_inputs(self, buttons: list[bool], axes: list[float]) -> None:
+        """Handles the full state of the controller, used by native backends"""
+        self.poll_state(InputState.from_lists(buttons, axes))
 
-        changed = [(i, v) for i, v in enumerate(buttons) if v != self.buttons[i]]
-        self.buttons = buttons
+    @if_connected
+    def poll_state(self, inputs: InputState) -> None:
+        """Handles the full state of the controller"""
+        self.inputs = inputs
+        self.process_inputs()
 
-        if state == "config":
-            self.handle_poll_in_config(axes, changed)
+    @if_connected
+    def batch(self, frames: str) -> None:
+        """Handles a batch of timestamped changes, replaying each of them in order so
+        that quick taps between two batches aren't lost"""
+        if self.inputs is None:
+            self.on_error("Batch received before full poll")
             return
-
-        for i, value in changed:
-            self.do_action(state, i, not value)
-
-        if any(axes) and not self.quick_select.is_shown:
-            self.do_axes_actions(state, axes)
-
-        assert self.overlay is not None
-        if self.config["Overlays Always On"]:
-            self.overlay.appear(state)
-
-        if self.scroll_up:
-            scroll(0, -SCROLL_FACTOR / 100)
-        elif self.scroll_down:
-            scroll(0, SCROLL_FACTOR / 100)
-
-    def parse_controller_inputs(
-        self, input_buttons: str, input_axes: str
-    ) -> tuple[list[bool], list[float]]:
-        """Parses the controller inputs"""
-        buttons = [button == "true" for button in input_buttons.split(",")]
-        axes = [float(axis) for axis in input_axes.split(",")]
-        while len(self.buttons) < len(buttons):
-            self.buttons.append(buttons[len(self.buttons)])
-        self.controller_specific_fixes(buttons, axes)
-        return buttons, axes
-
-    def controller_specific_fixes(self, buttons: list[bool], axes: list[float]):
-        """Fixes for specific controllers"""
-        assert self.profile is not None
-        if (
-            self.profile.controller.parent == "8BitDo Zero (X Input)"
-            and any(axes)
-            and not any(buttons[12:16])
-        ):
-            buttons[12] = axes[1] < -0.5 or axes[3] < -0.5
-            buttons[13] = axes[1] > 0.5 or axes[3] > 0.5
-            buttons[14] = axes[0] < -0.5 or axes[2] < -0.5
-            buttons[15] = axes[0] > 0.5 or axes[2] > 0.5
-
-        if (
-            self.profile.controller.parent == "8BitDo Zero (D Input)"
-            and any(axes)
-            and len(axes) > 5
-        ):
-            axes[0] = axes[0] or axes[2]
-            axes[1] = axes[1] or axes[5]
-
-    def handle_poll_in_config(
-        self, axes: list[float], changed: list[tuple[int, bool]]
-    ) -> None:
-        """Handles the polling of the controller when in the config dialog"""
-        for i, value in enumerate(axes):
-            pressed = abs(value) > 0.5
-            if pressed != self.axes[i]:
-                changed.append((i + 200, pressed))
-                if pressed:
-                    changed.append((i * 2 + 100 + (value > 0), pressed))
-                    changed.append((i * 2 + 100 + (value < 0), not pressed))
-                else:
-                    changed.append((i * 2 + 100, pressed))
-                    changed.append((i * 2 + 101, pressed))
-                self.axes[i] = pressed
-        for i, value in changed:
-            self.icons.set_highlight(i, value)
+        inputs = self.inputs
+        # Sample times of replayed traces are long past
+        live = self.replayer is None or not self.replayer.running
+        for timestamp, edges, changes in parse_batch(frames):
+            if live:
+                self.sample_time = timestamp
+                self.latency.record("bridge", self.receive_time - timestamp)
+            for index, pressed in edges:
+                inputs.set_button(index, pressed)
+            for index, value in changes:
+                inputs.set_axis(index, value)
+            self.process_inputs()
 
     @if_connected
-    def update_quick_select(
-        self, state: State, buttons: list[bool], axes: list[float]
-    ) -> None:
-        """Update the quick select menu."""
-        assert self.profile is not None
-        assert self.overlay is not None
-        if not self.quick_select.is_shown:
+    def heartbeat(self) -> None:
+        """Handles a poll in which nothing changed. Buttons don't need to be diffed,
+        but deflected sticks and held buttons still need to act."""
+        state = get_state()
+        self.process_time = time() * 1000
+        intents = self.engine.heartbeat(state, self.quick_select.is_shown, monotonic())
+        self.do_intents(state, intents)
+
+    def process_inputs(self) -> None:
+        """Translates the current controller state into actions"""
+        state = get_state()
+        if state == "NoFocus":
             return
+        self.process_time = time() * 1000
+        if self.receive_time:
+            self.latency.record("poll", self.process_time - self.receive_time)
 
-        if (
-            self.quick_select.settings["Select with D-Pad"]
-            and self.profile.controller.dpad_buttons is not None
-            and any(buttons[index] for index in self.profile.controller.dpad_buttons)
-        ):
-            up, down, left, right = self.profile.controller.dpad_buttons
-            dpad_status = buttons[up], buttons[down], buttons[left], buttons[right]
-            self.quick_select.dpad_select(state, dpad_status)
-            for index in self.profile.controller.dpad_buttons:
-                self.buttons[index] = buttons[index]
-        elif self.profile.controller.has_stick:
-            self.quick_select.stick_select(state, axes[0], axes[1])
+        if self.inputs is None or not self.inputs.num_buttons:
+            self.on_error("No buttons")
+            return
 
-        if (
-            (stick_button := self.profile.controller.stick_button) is not None
-            and self.quick_select.settings["Do Action on Stick Press"]
-            and buttons[stick_button]
-        ):
-            self.quick_select.disappear(True)
-            self.buttons[stick_button] = buttons[stick_button]
-        elif buttons[0]:
-            self.quick_select.disappear(True)
-            self.buttons[0] = buttons[0]
+        intents = self.engine.process(
+            state, self.inputs, self.quick_select.is_shown, monotonic()
+        )
+        self.do_intents(state, intents)
+
+    def do_intents(self, state: State, intents: list[Intent]) -> None:
+        """Carries out the intents returned by the input engine"""
+        for intent in intents:
+            kind = type(intent)
+            if kind is Press:
+                self.do_action(state, intent.action)
+                self.start_repeat(state, intent)
+            elif kind is Release:
+                self.repeater.release(intent.button)
+                self.do_release_action(intent.action)
+            elif kind is MoveCursor:
+                # An earlier action may have opened the quick select menu
+                if self.quick_select.is_shown:
+                    self.cursor_mover.stop()
+                else:
+                    self.cursor_mover.set_velocity(
+                        intent.x / STEP_INTERVAL, intent.y / STEP_INTERVAL
+                    )
+            elif kind is Scroll:
+                if self.quick_select.is_shown:
+                    self.scroller.stop()
+                else:
+                    self.scroller.set_velocity(
+                        intent.x / STEP_INTERVAL, intent.y / STEP_INTERVAL
+                    )
+            elif kind is ShowOverlay:
+                assert self.overlay is not None
+                self.overlay.appear(intent.state)
+            elif kind is Highlight:
+                self.icons.set_highlight(intent.index, intent.pressed)
+            elif kind is QuickSelectDpad:
+                self.quick_select.dpad_select(state, intent.pad)
+            elif kind is QuickSelectStick:
+                self.quick_select.stick_select(state, intent.x, intent.y)
+            elif kind is QuickSelectClose:
+                self.quick_select.disappear(True)
 
     @if_connected
     def show_quick_select(self, state: State) -> None:
         """Shows the quick select menu"""
+        self.cursor_mover.stop()
+        self.scroller.stop()
         if not self.quick_select.is_shown:
             self.quick_select.appear(state)
         if (
@@ -305,7 +434,7 @@ class Contanki(AnkiWebView):
     def hide_quick_select(self) -> None:
         """Hides the quick select menu and the overlays if they are shown."""
         self.quick_select.disappear()
-        self.axes = [True] * self.len_axes
+        self.engine.latch_axes()
         if self.overlay is not None:
             self.overlay.disappear()
 
@@ -322,58 +451,73 @@ class Contanki(AnkiWebView):
             self.show_quick_select(state)
 
     @if_connected
-    def do_action(self, state: State, button: int, release: bool = False) -> None:
-        """Calls the appropriate function on button press."""
-        assert self.profile is not None
-        if release:
-            return self.do_release_action(state, button)
-        action = self.profile.get(state, button)
+    def do_action(self, state: State, action: str) -> None:
+        """Calls the function for an action on button press."""
         if action == "Toggle Quick Select":
             self.toggle_quick_select(state)
         elif action == "Show Quick Select":
             self.show_quick_select(state)
-        else:
-            try:
-                if action in button_actions:
-                    button_actions[action]()
-                elif action in self.custom_actions:
-                    self.custom_actions[action]()
-            except Exception as err:  # pylint: disable=broad-except
-                tooltip("Error: " + repr(err))
+        elif (handler := self.handlers.get(action)) is not None:
+            self.executor.submit(
+                action,
+                self.run_action,
+                (handler, self.process_time, self.sample_time),
+            )
+
+    def run_action(
+        self, handler: Callable[[], Any], process_time: float, sample_time: float
+    ) -> None:
+        """Runs the handler for an action queued by do_action or repeat_action,
+        recording how long it waited and how long it took."""
+        start = time() * 1000
+        self.latency.record("dispatch", start - process_time)
+        try:
+            handler()
+        finally:
+            end = time() * 1000
+            self.latency.record("handler", end - start)
+            if sample_time:
+                self.latency.record("total", end - sample_time)
+
+    def inject_scroll_script(self, web_content: WebContent, context: Any) -> None:
+        """Adds scroll.js, which scrolls smoothly, to the pages of the main window."""
+        if context not in (mw.deckBrowser, mw.overview, mw.reviewer):
+            return
+        if (script := get_file("scroll.js")) is not None:
+            web_content.head += f"<script>{script}</script>"
+
+    def move_cursor(self, x: int, y: int) -> None:
+        """Called by the cursor integrator to move the cursor."""
+        try:
+            move_cursor(x, y)
+        except Exception as err:  # pylint: disable=broad-except
+            self.cursor_mover.stop()
+            tooltip("Error: " + repr(err))
+
+    def start_repeat(self, state: State, press: Press) -> None:
+        """Starts repeating the action of a held button, if it repeats."""
+        # Axes in button mode have no release, so only buttons repeat
+        if self.profile is None or press.button >= 100:
+            return
+        timing = get_repeat(self.profile.repeat, press.button, press.action)
+        if timing is not None:
+            self.repeater.press(press.button, state, press.action, *timing)
+
+    def repeat_action(self, state: State, action: str) -> None:
+        """Called by the repeat engine to repeat the action of a held button."""
+        if get_state() != state or self.quick_select.is_shown:
+            self.repeater.clear()
+        elif (handler := self.handlers.get(action)) is not None:
+            # Repeats have no input sample, so their total latency isn't recorded
+            self.executor.submit(action, self.run_action, (handler, time() * 1000, 0.0))
 
     @if_connected
-    def do_release_action(self, state: State, button: int) -> None:
-        """Calls the appropriate function on button release."""
-        assert self.profile is not None
-        action = self.profile.get(state, button)
+    def do_release_action(self, action: str) -> None:
+        """Calls the function for an action on button release."""
         if action == "Show Quick Select":
             self.hide_quick_select()
         elif action in release_actions:
-            try:
-                release_actions[action]()
-            except Exception as err:  # pylint: disable=broad-except
-                tooltip("Error: " + repr(err))
-
-    @if_connected
-    def do_axes_actions(self, state: State, axes: list[float]) -> None:
-        """Handles actions for axis movement."""
-        assert self.profile is not None
-        movements: dict[str, float] = defaultdict(float)
-        for axis, value in enumerate(axes):
-            if axis not in self.profile.axes_bindings:
-                continue
-            action = self.profile.axes_bindings[axis]
-            if action == "Buttons":
-                if abs(value) > 0.5 and not self.axes[axis]:
-                    self.do_action(state, axis * 2 + (value > 0) + 100)
-                self.axes[axis] = abs(value) > 0.5
-            else:
-                movements[action] += -value if self.profile.invert_axis[axis] else value
-        try:
-            move_mouse(movements["Cursor Horizontal"], movements["Cursor Vertical"])
-            scroll(movements["Scroll Horizontal"], movements["Scroll Vertical"])
-        except Exception as err:  # pylint: disable=broad-except
-            tooltip("Error: " + str(err))
+            self.executor.submit(action, release_actions[action])
 
     def on_connect(self, buttons: str | int, axes: str | int, *con: str) -> None:
         """Called when a controller connects through the JavaScript interface"""
@@ -405,8 +549,7 @@ class Contanki(AnkiWebView):
             return
 
         self.len_buttons, self.len_axes = buttons, axes
-        self.buttons = [False] * self.len_buttons
-        self.axes = [False] * self.len_axes
+        self.engine.reset(buttons, axes)
         self.controller_id = controller_id
 
         mw.form.menuTools.addAction(self.menu_item)
@@ -433,8 +576,11 @@ class Contanki(AnkiWebView):
             self.overlay.disappear()
         self.quick_select.disappear()
         mw.form.menuTools.removeAction(self.menu_item)
-        self.buttons = []
-        self.axes = []
+        self.engine.reset()
+        self.repeater.clear()
+        self.cursor_mover.stop()
+        self.scroller.stop()
+        self.inputs = None
         self.profile = None
         self.update_debug_info()
 
@@ -471,29 +617,26 @@ class Contanki(AnkiWebView):
             dbg("register_controllers called but no valid controllers found")
 
     def change_controller(self, index: int, _) -> None:
-        """Calls JavaScript to change the controller"""
+        """Asks the input backend to change the controller"""
         dbg(f"Changing controller to {index}")
-        self._evalWithCallback(
-            f"connect_controller(indices[{index}]);", None  # type: ignore
-        )
+        self.backend.connect(index)
 
     def update_debug_info(self):
         """Updates the debug info. View by pressing help in the config dialog."""
-        self._evalWithCallback("get_controller_info()", self._update_debug_info)
+        self.backend.get_controller_info(self._update_debug_info)
 
-    def _update_debug_info(self, controllers: str) -> None:
-        """Callback to receive the controller info from the JavaScript interface"""
-        if controllers is None:
-            self.debug_info: list[list[str]] = []
-        else:
-            self.debug_info = [
-                con.split("%") for con in controllers.split("%%%") if con
-            ]
+    def _update_debug_info(self, controllers: list[list[str]]) -> None:
+        """Callback to receive the controller info from the input backend"""
+        self.debug_info = controllers
         dbg(self.debug_info)
 
     def smooth_scroll(self, direction: bool, scroll: bool):
         """Smoothly scrolls the page"""
         if direction:
-            self.scroll_up = scroll
+            self.engine.scroll_up = scroll
         else:
-            self.scroll_down = scroll
+            self.engine.scroll_down = scroll
+        # Stop now, rather than on the next poll, which may be a heartbeat away
+        if not scroll:
+            intents = self.engine.stop_intents(self.engine.last_axes)
+            self.do_intents(get_state(), intents)
@@ -1,4 +1,27 @@
 let polling, connected_index, indices, ready, mock_index;
+let previous_buttons, previous_axes, last_sent, last_active, last_flush, last_timestamp;
+let queue = [];
+let input_active = false;
+
+// Overwritten from the add-on config by set_poll_config
+let poll_config = {
+   active_interval: 8,
+   idle_interval: 50,
+   idle_delay: 2000,
+   deadzone: 0.05,
+};
+
+// Axis movements smaller than this are not sent to Python
+const AXIS_THRESHOLD = 0.01;
+// Queued changes are sent to Python at most this often (ms)
+const FLUSH_INTERVAL = 25;
+// While a button is held or a stick deflected, a heartbeat is sent this often (ms)
+const ACTION_INTERVAL = 50;
+// Otherwise, a heartbeat is sent this often (ms)
+const HEARTBEAT_INTERVAL = 1000;
+// Full polls use the packed format, set to false to fall back to the text format
+const PACKED = true;
+const AXIS_SCALE = 127;
 initialise();
 
 function initialise() {
@@ -40,8 +63,31 @@ function on_controller_connect() {
    }
 }
 
-function connect_controller(i) {
+function set_poll_config(active_interval, idle_interval, idle_delay, deadzone) {
+   poll_config = { active_interval, idle_interval, idle_delay, deadzone };
+}
+
+function stop_polling() {
+   window.clearTimeout(polling);
    window.clearInterval(polling);
+}
+
+function schedule_poll() {
+   // Poll quickly while the controller is in use, and back off once it has been idle
+   let idle = performance.now() - last_active > poll_config.idle_delay;
+   let interval = idle ? poll_config.idle_interval : poll_config.active_interval;
+   polling = setTimeout(poll_loop, interval);
+}
+
+function poll_loop() {
+   // A disconnect may reconnect to another controller, which starts its own loop
+   if (poll()) {
+      schedule_poll();
+   }
+}
+
+function connect_controller(i) {
+   stop_polling();
    let con = window.navigator.getGamepads()[i];
    if (con == null) {
       bridgeCommand(
@@ -51,12 +97,17 @@ function connect_controller(i) {
    }
    bridgeCommand(`contanki::on_connect::${con.buttons.length}::${con.axes.length}::${con.id}`);
    connected_index = i;
-   setTimeout(() => (polling = setInterval(poll, 50)), 500);
+   previous_buttons = null;
+   queue = [];
+   last_active = performance.now();
+   polling = setTimeout(poll_loop, 500);
 }
 
 function on_controller_disconnect(event) {
-   window.clearInterval(polling);
+   stop_polling();
    connected_index = null;
+   previous_buttons = null;
+   queue = [];
    let controllers = window.navigator.getGamepads();
    for (let i = 0; i < controllers.length; i++) {
       if (controllers[i] != null) {
@@ -69,7 +120,7 @@ function on_controller_disconnect(event) {
 function poll() {
    if (connected_index == null) {
       on_controller_disconnect("connected_index == null");
-      return;
+      return false;
    }
 
    let con = window.navigator.getGamepads()[connected_index];
@@ -77,15 +128,96 @@ function poll() {
    try {
       if (!con.connected) {
          on_controller_disconnect("!con.connected");
-         return;
+         return false;
       }
    } catch (err) {
       on_controller_disconnect(err);
-      return;
+      return false;
    }
 
    let buttons = con.buttons.map((button) => button.pressed);
-   bridgeCommand(`contanki::poll::${buttons}::${con.axes}`);
+   if (previous_buttons == null) {
+      // The first poll after connecting sends the full state for Python to diff against
+      previous_buttons = buttons;
+      previous_axes = Array.from(con.axes);
+      last_timestamp = con.timestamp;
+      last_sent = last_flush = performance.now();
+      if (PACKED) {
+         bridgeCommand(`contanki::packed::${pack_inputs(buttons, con.axes)}`);
+      } else {
+         bridgeCommand(`contanki::poll::${buttons}::${con.axes}`);
+      }
+      return true;
+   }
+
+   // The timestamp only changes when the controller has new data
+   if (con.timestamp != last_timestamp) {
+      last_timestamp = con.timestamp;
+      queue_delta(buttons, con.axes, con.timestamp);
+   }
+   send_inputs();
+   return true;
+}
+
+function pack_inputs(buttons, axes) {
+   // Buttons as a hex bitmask with button 0 as the lowest bit. Numbers are exact up to
+   // 53 bits, so this avoids the 32 bit limit of bitwise operators.
+   let mask = 0;
+   for (let i = buttons.length - 1; i >= 0; i--) {
+      mask = mask * 2 + (buttons[i] ? 1 : 0);
+   }
+   // Axes quantized to signed bytes and base64 encoded
+   let quantized = Int8Array.from(axes, (axis) => Math.round(axis * AXIS_SCALE));
+   let packed_axes = btoa(String.fromCharCode(...new Uint8Array(quantized.buffer)));
+   return `${mask.toString(16)}::${packed_axes}`;
+}
+
+function queue_delta(buttons, axes, timestamp) {
+   // Queues the buttons and axes that changed, tagged with the sample time
+   let button_edges = [];
+   input_active = false;
+   for (let i = 0; i < buttons.length; i++) {
+      if (buttons[i] != previous_buttons[i]) {
+         button_edges.push(`${i}:${+buttons[i]}`);
+         previous_buttons[i] = buttons[i];
+      }
+      input_active = input_active || buttons[i];
+   }
+
+   let axis_changes = [];
+   for (let i = 0; i < axes.length; i++) {
+      let change = Math.abs(axes[i] - previous_axes[i]);
+      if (change > AXIS_THRESHOLD || (axes[i] == 0 && previous_axes[i] != 0)) {
+         axis_changes.push(`${i}:${axes[i]}`);
+         previous_axes[i] = axes[i];
+      }
+      input_active = input_active || Math.abs(previous_axes[i]) > poll_config.deadzone;
+   }
+
+   if (button_edges.length || axis_changes.length) {
+      let time = (performance.timeOrigin + timestamp).toFixed(1);
+      queue.push(`${time};${button_edges};${axis_changes}`);
+   }
+}
+
+function send_inputs() {
+   // Sends queued changes in batches, at most once every FLUSH_INTERVAL. The first
+   // change after a quiet period is sent immediately.
+   let now = performance.now();
+   if (input_active) {
+      last_active = now;
+   }
+   if (queue.length) {
+      if (now - last_flush >= FLUSH_INTERVAL) {
+         bridgeCommand(`contanki::batch::${queue.join("|")}`);
+         queue = [];
+         last_sent = last_flush = now;
+      }
+   } else if (now - last_sent >= (input_active ? ACTION_INTERVAL : HEARTBEAT_INTERVAL)) {
+      // Held buttons and deflected sticks still need to act regularly
+      last_sent = now;
+      bridgeCommand("contanki::heartbeat");
+   }
 }
 
 function mock_controller() {
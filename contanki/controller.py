@@ -7,7 +7,7 @@ import re
 from typing import Any
 import tomlkit
 
-from .utils import dbg, int_keys, get_file, user_files_path
+from .utils import dbg, int_keys, get_file, user_files_path, user_controllers_path
 
 
 def get_controller_data() -> dict[str, dict]:
@@ -39,6 +39,24 @@ def get_updated_controller_list() -> list[str]:
     return list(controller_data.keys())
 
 
+# The names of the controllers, and the modification time of the custom controllers
+# directory when they were loaded
+_controller_names: tuple[int, frozenset[str]] | None = None
+
+
+def get_controller_names() -> frozenset[str]:
+    """Returns the names of all controllers, including custom ones. They are only
+    loaded again when a custom controller is added or removed."""
+    global _controller_names  # pylint: disable=global-statement
+    try:
+        stamp = os.stat(user_controllers_path).st_mtime_ns
+    except OSError:
+        stamp = 0
+    if _controller_names is None or _controller_names[0] != stamp:
+        _controller_names = (stamp, frozenset(get_controller_data()))
+    return _controller_names[1]
+
+
 class Controller:
     """Represents a controller, gamepad, or other input device."""
 
@@ -61,6 +79,10 @@ class Controller:
         self.supported: bool = kwargs["supported"]
         self.is_custom = "is_custom" in kwargs and kwargs["is_custom"]
         self.parent = Controller(kwargs["parent"]) if self.is_custom else self
+        # Fixes for quirks in how the controller reports input, see transforms.py
+        self.transforms: list[dict[str, Any]] = kwargs.get("transforms") or (
+            self.parent.transforms if self.parent is not self else []
+        )
 
     @staticmethod
     def from_dict(data: dict[str, Any]) -> Controller:
@@ -70,6 +92,7 @@ class Controller:
         """Returns a copy of the controller."""
         controller = Controller(self.name)
         controller.parent = self.parent
+        controller.transforms = self.transforms
         return controller
 
     def __str__(self) -> str:
@@ -159,6 +182,7 @@ class Controller:
                 "supported": self.supported,
                 "is_custom": self.is_custom,
                 "parent": self.parent.name,
+                "transforms": self.transforms,
             }
         )
 
@@ -184,6 +208,8 @@ class Controller:
         add_table("buttons", self.buttons)
         add_table("axes", self.axes)
         add_table("axis_buttons", self.axis_buttons)
+        if self.transforms:
+            doc["transforms"] = self.transforms
 
         return doc.as_string()
 
@@ -0,0 +1,74 @@
+"""
+Moves the cursor smoothly at the speed set by the stick, on a fast timer of its own,
+rather than in a jump each time the controller is polled.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import Any, Callable
+
+# How often the cursor is moved while the stick is deflected (ms)
+CURSOR_INTERVAL = 8
+# The cursor stops if the speed isn't updated for this long (seconds), e.g. when
+# Anki loses focus while the stick is deflected
+STALE_AFTER = 0.25
+
+
+class CursorIntegrator:
+    """
+    Moves the cursor by whole pixels with move, at the velocity last set in pixels
+    per second. The fractions of a pixel left over are carried to the next move, so
+    slow movement is smooth too. timer, a QTimer, only runs while the cursor moves.
+    """
+
+    def __init__(
+        self,
+        timer: Any,
+        move: Callable[[int, int], None],
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.timer = timer
+        self.move = move
+        self.clock = clock
+        self.velocity = (0.0, 0.0)
+        self.remainder = [0.0, 0.0]
+        self.last_tick = 0.0
+        self.last_update = 0.0
+        self.timer.timeout.connect(self.tick)
+
+    def set_velocity(self, x: float, y: float) -> None:
+        """Sets the speed of the cursor in pixels per second, stopping it for 0, 0."""
+        if not x and not y:
+            self.stop()
+            return
+        now = self.clock()
+        self.last_update = now
+        if self.velocity == (0.0, 0.0):
+            self.last_tick = now
+            self.timer.start(CURSOR_INTERVAL)
+        self.velocity = (x, y)
+
+    def stop(self) -> None:
+        """Stops the cursor."""
+        self.velocity = (0.0, 0.0)
+        self.remainder = [0.0, 0.0]
+        self.timer.stop()
+
+    def tick(self) -> None:
+        """Moves the cursor by the distance covered since the last tick."""
+        now = self.clock()
+        if now - self.last_update > STALE_AFTER:
+            self.stop()
+            return
+        elapsed, self.last_tick = now - self.last_tick, now
+        remainder = self.remainder
+        remainder[0] += self.velocity[0] * elapsed
+        remainder[1] += self.velocity[1] * elapsed
+        x, y = int(remainder[0]), int(remainder[1])
+        if x or y:
+            remainder[0] -= x
+            remainder[1] -= y
+            self.move(x, y)
@@ -0,0 +1,360 @@
+"""
+Translates controller input into intents - the actions to run and the cursor and
+scroll movements to make - without side effects, so that the input path can be
+tested and benchmarked without running Anki. Contanki carries out the intents.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Sequence, Union
+
+from .axes import AxisPipeline
+from .inputs import InputState, changed_buttons
+from .profile import Profile
+from .transforms import Transform, compile_transforms
+from .utils import State, dbg
+
+# Cursor and scroll speeds are per action, so continuous actions are limited to this
+# interval (seconds) however fast the controller is polled
+CONTINUOUS_INTERVAL = 0.04
+# Cursor and scroll speeds were tuned for one step every 50 ms poll, so steps are
+# distances per this interval (seconds), whatever the interval between steps
+STEP_INTERVAL = 0.05
+
+
+class Press(NamedTuple):
+    """Run the action bound to a button which was pressed."""
+
+    button: int
+    action: str
+
+
+class Release(NamedTuple):
+    """Run the release action bound to a button which was released."""
+
+    button: int
+    action: str
+
+
+class MoveCursor(NamedTuple):
+    """Move the cursor, in pixels per STEP_INTERVAL. 0, 0 stops the cursor once the
+    stick returns to the deadzone."""
+
+    x: float
+    y: float
+
+
+class Scroll(NamedTuple):
+    """Scroll the page, in pixels per STEP_INTERVAL. 0, 0 stops scrolling once
+    the stick returns to the deadzone and smooth scrolling ends."""
+
+    x: float
+    y: float
+
+
+class ShowOverlay(NamedTuple):
+    """Show the controls overlay, when it is always on."""
+
+    state: State
+
+
+class Highlight(NamedTuple):
+    """Highlight an input in the config dialog."""
+
+    index: int
+    pressed: bool
+
+
+class QuickSelectDpad(NamedTuple):
+    """Select a quick select action with the d-pad."""
+
+    pad: tuple[bool, bool, bool, bool]
+
+
+class QuickSelectStick(NamedTuple):
+    """Select a quick select action with the stick."""
+
+    x: float
+    y: float
+
+
+class QuickSelectClose(NamedTuple):
+    """Close the quick select menu, doing the selected action."""
+
+    button: int
+
+
+Intent = Union[
+    Press,
+    Release,
+    MoveCursor,
+    Scroll,
+    ShowOverlay,
+    Highlight,
+    QuickSelectDpad,
+    QuickSelectStick,
+    QuickSelectClose,
+]
+
+
+class InputEngine:
+    """Keeps the state of the controller inputs, and turns new input into intents."""
+
+    def __init__(self) -> None:
+        self.profile: Profile | None = None
+        self.pipeline: AxisPipeline | None = None
+        self.transform: Transform | None = None
+        self.config: dict[str, Any] = {}
+        self.quick_select_settings: dict[str, Any] = {}
+        self.overlays_always_on = False
+        self.smooth_scroll_step = 0.0
+        self.scroll_up = False
+        self.scroll_down = False
+        # A bitmask of the pressed buttons, see InputState
+        self.buttons = 0
+        self.num_buttons = 0
+        # Whether each axis is pushed past halfway, for axes in button mode
+        self.axes: list[bool] = []
+        self.last_axes: Sequence[float] = []
+        self.last_continuous = 0.0
+        self.cursor_moving = False
+        self.scrolling = False
+
+    def set_profile(
+        self, profile: Profile | None, quick_select_settings: dict[str, Any]
+    ) -> None:
+        """Sets the profile, and the quick select settings with defaults applied."""
+        self.profile = profile
+        self.quick_select_settings = quick_select_settings
+        self.transform = None
+        if profile is not None:
+            try:
+                self.transform = compile_transforms(profile.controller.transforms)
+            except (KeyError, TypeError, ValueError) as err:
+                dbg(f"Invalid transforms for {profile.controller}: {err!r}")
+        self.compile_pipeline()
+
+    def set_config(self, config: dict[str, Any], smooth_scroll_step: float) -> None:
+        """Applies the add-on config."""
+        self.config = config
+        self.overlays_always_on = config["Overlays Always On"]
+        self.smooth_scroll_step = smooth_scroll_step
+        self.compile_pipeline()
+
+    def compile_pipeline(self) -> None:
+        """Prepares the axis pipeline for the profile and config."""
+        if self.profile is None or not self.config:
+            self.pipeline = None
+            return
+        self.pipeline = AxisPipeline(
+            self.profile.axes_bindings,
+            self.profile.invert_axis,
+            len(self.axes) or self.profile.len_axes,
+            self.config,
+        )
+
+    def reset(self, len_buttons: int = 0, len_axes: int = 0) -> None:
+        """Clears the input state, for a newly connected controller."""
+        self.buttons = 0
+        self.num_buttons = len_buttons
+        self.axes = [False] * len_axes
+        self.last_axes = []
+        self.scroll_up = self.scroll_down = False
+        self.cursor_moving = self.scrolling = False
+        if self.pipeline is not None and len_axes:
+            self.pipeline.compile(len_axes)
+
+    def latch_axes(self) -> None:
+        """Stops axes in button mode acting until they are released, e.g. after the
+        stick was used to select from the quick select menu."""
+        self.axes = [True] * len(self.axes)
+
+    def process(
+        self,
+        state: State,
+        inputs: InputState,
+        quick_select_shown: bool,
+        now: float,
+    ) -> list[Intent]:
+        """Returns the intents for the full state of the controller. The state passed
+        in is not modified, but its axes are kept for heartbeats."""
+        if state == "NoFocus" or not inputs.num_buttons:
+            return []
+        if self.transform is not None:
+            inputs = inputs.copy()
+            self.transform(inputs)
+        # Some controllers report more buttons than they said they had, which
+        # start out as they are rather than being pressed
+        if inputs.num_buttons > self.num_buttons:
+            new_buttons = inputs.buttons >> self.num_buttons << self.num_buttons
+            self.buttons |= new_buttons
+            self.num_buttons = inputs.num_buttons
+        axes = inputs.axes
+
+        if quick_select_shown:
+            return self.quick_select_intents(inputs)
+
+        changed = changed_buttons(self.buttons, inputs.buttons)
+        self.buttons = inputs.buttons
+        self.last_axes = axes
+
+        if state == "config":
+            return self.config_intents(axes, changed)
+
+        intents: list[Intent] = []
+        for i, value in changed:
+            intent = self.button_intent(state, i, value)
+            if intent is not None:
+                intents.append(intent)
+        intents.extend(self.continuous(state, axes, quick_select_shown, now))
+        return intents
+
+    def heartbeat(
+        self, state: State, quick_select_shown: bool, now: float
+    ) -> list[Intent]:
+        """Returns the intents for held inputs when nothing has changed."""
+        if state in ("NoFocus", "config") or quick_select_shown:
+            return []
+        return self.continuous(state, self.last_axes, quick_select_shown, now)
+
+    def button_intent(self, state: State, button: int, pressed: bool) -> Intent | None:
+        """Returns the intent for a button being pressed or released, if any."""
+        assert self.profile is not None
+        action = self.profile.get(state, button)
+        if not action:
+            return None
+        return Press(button, action) if pressed else Release(button, action)
+
+    def continuous(
+        self, state: State, axes: Sequence[float], quick_select_shown: bool, now: float
+    ) -> list[Intent]:
+        """Returns the intents which happen on every poll, such as moving the cursor,
+        at most once every CONTINUOUS_INTERVAL."""
+        if now - self.last_continuous < CONTINUOUS_INTERVAL:
+            # Stops aren't rate limited, so that the cursor and scrolling stop as soon
+            # as the stick is released, rather than on the next heartbeat
+            return self.stop_intents(axes)
+        self.last_continuous = now
+        intents: list[Intent] = []
+        was_moving, self.cursor_moving = self.cursor_moving, False
+        was_scrolling, self.scrolling = self.scrolling, False
+        if any(axes) and not quick_select_shown:
+            intents.extend(self.axes_intents(state, axes))
+        if was_moving and not self.cursor_moving:
+            intents.append(MoveCursor(0.0, 0.0))
+        if self.overlays_always_on:
+            intents.append(ShowOverlay(state))
+        if (self.scroll_up or self.scroll_down) and self.pipeline is not None:
+            step = (
+                -self.smooth_scroll_step if self.scroll_up else self.smooth_scroll_step
+            )
+            if (scroll := self.pipeline.scroll(0, step)) is not None:
+                self.add_scroll(intents, *scroll)
+        if was_scrolling and not self.scrolling:
+            intents.append(Scroll(0.0, 0.0))
+        return intents
+
+    def stop_intents(self, axes: Sequence[float]) -> list[Intent]:
+        """Returns the intents stopping the cursor and scrolling, if their sticks have
+        returned to the deadzone and smooth scrolling has ended since the last
+        continuous step."""
+        if not (self.cursor_moving or self.scrolling) or self.pipeline is None:
+            return []
+        cursor, scroll = self.pipeline.process(axes) if any(axes) else (None, None)
+        intents: list[Intent] = []
+        if self.cursor_moving and cursor is None:
+            intents.append(MoveCursor(0.0, 0.0))
+            self.cursor_moving = False
+        if (
+            self.scrolling
+            and scroll is None
+            and not (self.scroll_up or self.scroll_down)
+        ):
+            intents.append(Scroll(0.0, 0.0))
+            self.scrolling = False
+        return intents
+
+    def add_scroll(self, intents: list[Intent], x: float, y: float) -> None:
+        """Adds scrolling to intents, combined with the stick's scrolling if any, as
+        each Scroll sets the speed of scrolling."""
+        if self.scrolling:
+            for i, intent in enumerate(intents):
+                if isinstance(intent, Scroll):
+                    intents[i] = Scroll(intent.x + x, intent.y + y)
+                    return
+        intents.append(Scroll(x, y))
+        self.scrolling = True
+
+    def axes_intents(self, state: State, axes: Sequence[float]) -> list[Intent]:
+        """Returns the intents for axis movement."""
+        assert self.pipeline is not None
+        intents: list[Intent] = []
+        cursor, scroll = self.pipeline.process(axes)
+        for axis in self.pipeline.button_axes:
+            value = axes[axis]
+            if abs(value) > 0.5 and not self.axes[axis]:
+                intent = self.button_intent(state, axis * 2 + (value > 0) + 100, True)
+                if intent is not None:
+                    intents.append(intent)
+            self.axes[axis] = abs(value) > 0.5
+        if cursor is not None:
+            intents.append(MoveCursor(*cursor))
+            self.cursor_moving = True
+        if scroll is not None:
+            self.add_scroll(intents, *scroll)
+        return intents
+
+    def config_intents(
+        self, axes: Sequence[float], changed: list[tuple[int, bool]]
+    ) -> list[Intent]:
+        """Returns the inputs to highlight in the config dialog."""
+        for i, value in enumerate(axes):
+            pressed = abs(value) > 0.5
+            if pressed != self.axes[i]:
+                changed.append((i + 200, pressed))
+                if pressed:
+                    changed.append((i * 2 + 100 + (value > 0), pressed))
+                    changed.append((i * 2 + 100 + (value < 0), not pressed))
+                else:
+                    changed.append((i * 2 + 100, pressed))
+                    changed.append((i * 2 + 101, pressed))
+                self.axes[i] = pressed
+        return [Highlight(i, value) for i, value in changed]
+
+    def quick_select_intents(self, inputs: InputState) -> list[Intent]:
+        """Returns the intents for selecting from the quick select menu."""
+        assert self.profile is not None
+        controller = self.profile.controller
+        settings = self.quick_select_settings
+        pressed = inputs.pressed
+        intents: list[Intent] = []
+        if (
+            settings["Select with D-Pad"]
+            and (dpad := controller.dpad_buttons) is not None
+            and any(pressed(index) for index in dpad)
+        ):
+            up, down, left, right = dpad
+            intents.append(
+                QuickSelectDpad(
+                    (pressed(up), pressed(down), pressed(left), pressed(right))
+                )
+            )
+            # The d-pad buttons are used up, so don't act once the menu closes
+            dpad_mask = (1 << up) | (1 << down) | (1 << left) | (1 << right)
+            self.buttons = self.buttons & ~dpad_mask | inputs.buttons & dpad_mask
+        elif controller.has_stick:
+            intents.append(QuickSelectStick(inputs.axes[0], inputs.axes[1]))
+
+        if (
+            (stick_button := controller.stick_button) is not None
+            and settings["Do Action on Stick Press"]
+            and pressed(stick_button)
+        ):
+            intents.append(QuickSelectClose(stick_button))
+            self.buttons |= 1 << stick_button
+        elif pressed(0):
+            intents.append(QuickSelectClose(0))
+            self.buttons |= 1
+        return intents
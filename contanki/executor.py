@@ -0,0 +1,67 @@
+"""
+Runs actions after the input that triggered them has been handled, so that a slow
+action doesn't hold up reading the controller.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Any, Callable
+
+from .latency import Histogram
+
+
+class ActionExecutor:
+    """
+    Queues actions and runs them together once schedule, which must call a function
+    soon from the event loop, gets to them. The time each action takes is kept, by
+    name.
+    """
+
+    def __init__(
+        self,
+        schedule: Callable[[Callable[[], None]], None],
+        on_error: Callable[[Exception], None] | None = None,
+        clock: Callable[[], float] = perf_counter,
+    ) -> None:
+        self.schedule = schedule
+        self.on_error = on_error
+        self.clock = clock
+        self.queue: list[tuple[str, Callable[..., Any], tuple]] = []
+        self.scheduled = False
+        self.stats: dict[str, Histogram] = {}
+
+    def submit(self, name: str, func: Callable[..., Any], args: tuple = ()) -> None:
+        """Queues func to be called with args."""
+        self.queue.append((name, func, args))
+        if not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.drain)
+
+    def drain(self) -> None:
+        """Runs the queued actions, in the order they were queued."""
+        queue, self.queue = self.queue, []
+        self.scheduled = False
+        for name, func, args in queue:
+            start = self.clock()
+            try:
+                func(*args)
+            except Exception as err:  # pylint: disable=broad-except
+                if self.on_error is None:
+                    raise
+                self.on_error(err)
+            finally:
+                if name not in self.stats:
+                    self.stats[name] = Histogram()
+                self.stats[name].record((self.clock() - start) * 1000)
+
+    def summary(self) -> list[str]:
+        """Returns a line for each action, slowest in total first."""
+        return [
+            f"{name}: {hist.summary()}"
+            for name, hist in sorted(
+                self.stats.items(), key=lambda item: -item[1].total
+            )
+        ]
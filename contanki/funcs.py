@@ -8,6 +8,7 @@ from typing import Any, Callable
 from functools import partial
 from os.path import dirname, abspath
 
+from aqt import gui_hooks
 from aqt.deckoptions import display_options_for_deck_id
 from aqt.qt import (
     QCoreApplication,
@@ -17,6 +18,8 @@ from aqt.qt import (
     QPoint,
     QPointF,
     Qt,
+    QWidget,
+    qconnect,
 )
 from aqt.qt import QKeyEvent as QKE
 from aqt.utils import current_window, tooltip, supportText
@@ -32,6 +35,9 @@ except ImportError:
     is_win = False
 
 from .utils import State, dbg
+from .state import StateTracker
+from .screens import ScreenTopology
+from .axes import quad_curve
 
 from aqt import mw as _mw
 
@@ -62,6 +68,11 @@ def get_config() -> dict:
         "Overlays Always On": False,
         "Overlays in Quick Select": True,
         "Detect 8BitDo Controllers": False,
+        "Active Poll Interval": 8,
+        "Idle Poll Interval": 50,
+        "Idle Delay": 2000,
+        "Native Input (Linux)": False,
+        "Input Daemon (Linux)": False,
         "Custom Actions": {},
     }
 
@@ -76,23 +87,54 @@ def get_config() -> dict:
     return config
 
 
+state_tracker = StateTracker()
+
+
 def get_state() -> State:
     """
     Returns the current state of the Anki window.
 
     Note that 'question' or 'answer' is returned instead of 'review'.
     """
-    if (focus := current_window()) is None:
-        return "NoFocus"
-    if (window := focus.objectName()) == "MainWindow":
-        state = mw.state
-        return mw.reviewer.state if state == "review" else state  # type: ignore
-    elif window == "Preferences":
-        return "dialog"
-    elif window == "Contanki Options":
-        return "config"
-    else:
-        return "NoFocus"
+    return state_tracker.state
+
+
+def sync_state() -> None:
+    """Reads the current state from Anki, rather than waiting for a hook."""
+    focus = current_window()
+    state_tracker.sync(
+        focus.objectName() if focus is not None else None,
+        mw.state,
+        getattr(mw.reviewer, "state", None),
+    )
+
+
+def start_state_tracking() -> None:
+    """Updates the state from Anki's hooks and focus changes from now on."""
+
+    def on_focus_changed(_old: QWidget | None, new: QWidget | None) -> None:
+        if new is None:
+            state_tracker.set_window(None)
+        elif new.window().objectName() == "MainWindow":
+            # Reading the main window's state here catches anything hooks missed
+            sync_state()
+        else:
+            state_tracker.set_window(new.window().objectName())
+
+    qconnect(mw.app.focusChanged, on_focus_changed)
+    gui_hooks.state_did_change.append(
+        lambda new_state, _old_state: state_tracker.set_main_state(new_state)
+    )
+    gui_hooks.reviewer_did_show_question.append(
+        lambda _card: state_tracker.set_reviewer_state("question")
+    )
+    gui_hooks.reviewer_did_show_answer.append(
+        lambda _card: state_tracker.set_reviewer_state("answer")
+    )
+    gui_hooks.reviewer_did_answer_card.append(
+        lambda *_: state_tracker.set_reviewer_state("transition")
+    )
+    sync_state()
 
 
 def for_states(states: list[State]) -> Callable:
@@ -116,11 +158,6 @@ def _pass() -> None:
     pass
 
 
-def quad_curve(value: float, factor: int = 5) -> float:
-    """Used to calculate cursor and scroll acceleration."""
-    return ((value * factor) ** 2) * value
-
-
 def _get_dark_mode() -> Callable[[], bool]:
     """Gets the current Anki dark mode setting."""
     # pylint: disable=import-outside-toplevel
@@ -198,57 +235,60 @@ def scroll_build() -> Callable[[float, float], None]:
     def _scroll(x: float, y: float) -> None:  # pylint: disable=invalid-name
         if abs(x) + abs(y) < deadzone:
             return
-        mw.web.eval(f"window.scrollBy({quad_curve(x*speed)}, {quad_curve(y*speed)})")
+        scroll_by(quad_curve(x * speed), quad_curve(y * speed))
 
     return _scroll
 
 
-def move_mouse_build() -> Callable[[float, float], None]:
-    """Builds a function that moves the mouse, accounting for user settings."""
+def scroll_by(x: float, y: float) -> None:
+    """Scrolls the main window's page."""
+    mw.web.eval(f"window.scrollBy({x}, {y})")
+
+
+def move_cursor_build() -> Callable[[float, float], None]:
+    """Builds a function that moves the cursor by a number of pixels, keeping it on
+    a screen."""
     if mw is None:  # for out of anki profile tests
         return lambda x, y: None
-    config = get_config()
-    assert config is not None
-    speed = config["Cursor Speed"] / 2
-    accel = config["Cursor Acceleration"] / 5
-    deadzone = config["Stick Deadzone"] / 100
-    multiple_screens = dbg("Multiple screens", len(mw.app.screens()) > 1)
 
-    def move_mouse(move_x: float, move_y: float) -> None:
-        if abs(move_x) + abs(move_y) < deadzone:
-            return
+    def move_cursor(delta_x: float, delta_y: float) -> None:
         cursor = mw.cursor()
         pos = cursor.pos()  # type: ignore
-        if multiple_screens:
-            for screen in mw.app.screens():
-                if screen.geometry().contains(pos):
-                    geom = screen.geometry()
-                    break
-            else:
-                return
-        else:
-            main_screen = mw.screen()
-            assert main_screen is not None
-            geom = main_screen.geometry()
-
-        x = pos.x() + ((abs(move_x) * speed) ** (accel + 1)) * move_x
-        y = pos.y() + ((abs(move_y) * speed) ** (accel + 1)) * move_y
-        x, y = int(x), int(y)
-
-        if not geom.contains(QPoint(x, y)):
-            if multiple_screens:
-                for screen in mw.app.screens():
-                    if screen.geometry().contains(QPoint(x, y)):
-                        geom = screen.geometry()
-                        break
-            x = min(max(x, geom.x()), geom.width() + geom.x() - 1)
-            y = min(max(y, geom.y()), geom.height() + geom.y() - 1)
-
-        pos.setX(x)
-        pos.setY(y)
+        new_pos = screen_topology.move(pos.x(), pos.y(), delta_x, delta_y)
+        if new_pos is None:
+            return
+        pos.setX(new_pos[0])
+        pos.setY(new_pos[1])
         cursor.setPos(pos)
 
-    return move_mouse
+    return move_cursor
+
+
+screen_topology = ScreenTopology()
+
+
+def update_screens() -> None:
+    """Reads the geometry of the screens from Qt."""
+    screens = []
+    for screen in mw.app.screens():
+        geom = screen.geometry()
+        screens.append((geom.x(), geom.y(), geom.width(), geom.height()))
+    screen_topology.set_screens(screens)
+    dbg("Screens", screens)
+
+
+def start_screen_tracking() -> None:
+    """Keeps the screen topology up to date from now on."""
+
+    def on_screen_added(screen: Any) -> None:
+        qconnect(screen.geometryChanged, lambda _geom: update_screens())
+        update_screens()
+
+    for screen in mw.app.screens():
+        qconnect(screen.geometryChanged, lambda _geom: update_screens())
+    qconnect(mw.app.screenAdded, on_screen_added)
+    qconnect(mw.app.screenRemoved, lambda _screen: update_screens())
+    update_screens()
 
 
 def hide_cursor() -> None:
@@ -542,6 +582,10 @@ def get_debug_str() -> str:
     result += f"<br>{count} controller{'' if count == 1 else 's'} detected:<br>"
     for con_id, num_buttons, num_axes in debug_info:
         result += f"{con_id}<br>Buttons: {num_buttons}<br>Axes: {num_axes}<br><br>"
+    result += "Input latency (ms):<br>"
+    result += "<br>".join(mw.contanki.latency.summary())  # type: ignore
+    result += "<br><br>Action time (ms):<br>"
+    result += "<br>".join(mw.contanki.executor.summary())  # type: ignore
     return result
 
 
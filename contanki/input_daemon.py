@@ -0,0 +1,101 @@
+"""
+A helper process which owns the controller devices and writes their state to a
+ring buffer in shared memory, so that Anki never does device I/O.
+
+Run it with the Python which has evdev installed, e.g.
+    python3 /path/to/contanki/input_daemon.py
+"""
+
+# This file runs outside of Anki, so it should not import any Anki modules.
+
+from __future__ import annotations
+
+import os
+import signal
+import sys
+from time import time
+
+if not __package__:
+    # Run as a script. Register the add-on as a bare package, as its __init__
+    # needs Anki.
+    import types  # pylint: disable=ungrouped-imports
+
+    _package = types.ModuleType("contanki")
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules["contanki"] = _package
+    __package__ = "contanki"  # pylint: disable=redefined-builtin
+
+# pylint: disable=wrong-import-position
+from .backends import EvdevBackend
+from .ringbuffer import (
+    CONNECT,
+    DISCONNECT,
+    STATE,
+    InputRecord,
+    RingWriter,
+    default_ring_path,
+)
+
+
+class RingTarget:
+    """Receives controller input from a backend and writes it to the ring buffer."""
+
+    def __init__(self, writer: RingWriter) -> None:
+        self.writer = writer
+        self.backend: EvdevBackend | None = None
+        self.num_buttons = 0
+        self.num_axes = 0
+
+    def on_connect(self, num_buttons: int, num_axes: int, con_id: str) -> None:
+        """Writes a connect record."""
+        self.num_buttons, self.num_axes = int(num_buttons), int(num_axes)
+        self.writer.write(
+            InputRecord(time(), CONNECT, self.num_buttons, self.num_axes, 0, (), con_id)
+        )
+
+    def on_disconnect(self, _error: str = "") -> None:
+        """Writes a disconnect record."""
+        self.writer.write(InputRecord(time(), DISCONNECT, 0, 0, 0, ()))
+
+    def register_controllers(self, *_controllers: str) -> None:
+        """Connects to the first controller, as there is no one to choose."""
+        if self.backend is not None:
+            self.backend.connect(0)
+
+    def poll_inputs(self, buttons: list[bool], axes: list[float]) -> None:
+        """Writes a state record."""
+        mask = sum(1 << i for i, pressed in enumerate(buttons) if pressed)
+        self.writer.write(
+            InputRecord(time(), STATE, len(buttons), len(axes), mask, tuple(axes))
+        )
+
+    def heartbeat(self) -> None:
+        """The reader keeps held inputs acting itself."""
+
+
+def main() -> None:
+    """Runs the daemon until it is interrupted or terminated."""
+    if not EvdevBackend.is_available():
+        sys.exit("The input daemon requires Linux and the evdev package")
+    path = sys.argv[1] if len(sys.argv) > 1 else default_ring_path()
+    writer = RingWriter(path)
+    target = RingTarget(writer)
+    # The backend's thread is the only writer, so calls can run where they are made
+    backend = EvdevBackend(target, post=lambda func: func())
+    target.backend = backend
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    backend.start()
+    try:
+        assert backend.thread is not None
+        while backend.thread.is_alive():
+            backend.thread.join(1)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        backend.stop()
+        target.on_disconnect()
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Decodes the controller inputs sent by controller.js.
+"""
+
+# For ease of testing, this file should not import from outside the standard library.
+
+from __future__ import annotations
+
+from array import array
+from base64 import b64encode
+from binascii import a2b_base64
+from itertools import chain
+from typing import Iterable
+
+# Axes are quantized to signed bytes for the packed format
+AXIS_SCALE = 127
+
+# Lookup tables so that decoding packed inputs needs no per-element Python code
+_BYTE_BITS = tuple(tuple(bool(byte >> i & 1) for i in range(8)) for byte in range(256))
+_BYTE_AXES = tuple(
+    (byte - 256 if byte > 127 else byte) / AXIS_SCALE for byte in range(256)
+)
+
+
+def parse_text_inputs(
+    input_buttons: str, input_axes: str
+) -> tuple[list[bool], list[float]]:
+    """Parses the text format, e.g. 'true,false,false' and '0.1,-0.5'."""
+    buttons = [button == "true" for button in input_buttons.split(",")]
+    axes = [float(axis) for axis in input_axes.split(",")]
+    return buttons, axes
+
+
+def parse_packed_inputs(
+    input_buttons: str, input_axes: str, num_buttons: int
+) -> tuple[list[bool], list[float]]:
+    """
+    Parses the packed format. Buttons are a hex bitmask with button 0 as the lowest
+    bit, and axes are base64 encoded signed bytes scaled by AXIS_SCALE.
+    """
+    mask = int(input_buttons, 16)
+    mask = mask.to_bytes((max(num_buttons, mask.bit_length()) + 7) // 8, "little")
+    buttons = list(chain.from_iterable(map(_BYTE_BITS.__getitem__, mask)))
+    del buttons[num_buttons:]
+    axes = list(map(_BYTE_AXES.__getitem__, a2b_base64(input_axes)))
+    return buttons, axes
+
+
+class InputState:
+    """
+    The state of a controller's inputs: the pressed buttons as a bitmask, with button
+    0 as the lowest bit, and the axes as an array. Changes are made in place, so that
+    handling a change doesn't create new lists. Axes are doubles rather than floats so
+    that the values are the same as from the lists used by the text format.
+    """
+
+    __slots__ = ("buttons", "num_buttons", "axes")
+
+    def __init__(
+        self, buttons: int = 0, num_buttons: int = 0, axes: Iterable[float] = ()
+    ) -> None:
+        self.buttons = buttons
+        self.num_buttons = max(num_buttons, buttons.bit_length())
+        self.axes = array("d", axes)
+
+    @classmethod
+    def from_lists(cls, buttons: list[bool], axes: Iterable[float]) -> InputState:
+        """Creates the state from a list of buttons and the axes."""
+        mask = 0
+        for i, pressed in enumerate(buttons):
+            if pressed:
+                mask |= 1 << i
+        return cls(mask, len(buttons), axes)
+
+    @classmethod
+    def from_packed(
+        cls, input_buttons: str, input_axes: str, num_buttons: int
+    ) -> InputState:
+        """Creates the state from the packed format, see parse_packed_inputs."""
+        return cls(
+            int(input_buttons, 16),
+            num_buttons,
+            map(_BYTE_AXES.__getitem__, a2b_base64(input_axes)),
+        )
+
+    def __repr__(self) -> str:
+        return f"InputState({self.buttons:#x}, {self.num_buttons}, {list(self.axes)})"
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, InputState)
+            and self.buttons == other.buttons
+            and self.num_buttons == other.num_buttons
+            and self.axes == other.axes
+        )
+
+    def copy(self) -> InputState:
+        """Returns a copy of the state."""
+        return InputState(self.buttons, self.num_buttons, self.axes)
+
+    def pressed(self, button: int) -> bool:
+        """Returns whether a button is pressed."""
+        return bool(self.buttons >> button & 1)
+
+    def set_button(self, button: int, pressed: bool) -> None:
+        """Presses or releases a button."""
+        if pressed:
+            self.buttons |= 1 << button
+        else:
+            self.buttons &= ~(1 << button)
+        if button >= self.num_buttons:
+            self.num_buttons = button + 1
+
+    def set_axis(self, axis: int, value: float) -> None:
+        """Sets the value of an axis."""
+        if axis >= len(self.axes):
+            self.axes.extend([0.0] * (axis + 1 - len(self.axes)))
+        self.axes[axis] = value
+
+    def button_list(self) -> list[bool]:
+        """Returns the buttons as a list."""
+        buttons = self.buttons
+        return [bool(buttons >> i & 1) for i in range(self.num_buttons)]
+
+
+def changed_buttons(old: int, new: int) -> list[tuple[int, bool]]:
+    """Returns the buttons which differ between two bitmasks, and whether each is
+    pressed in new, in order."""
+    changed = []
+    diff = old ^ new
+    while diff:
+        bit = diff & -diff
+        changed.append((bit.bit_length() - 1, bool(new & bit)))
+        diff ^= bit
+    return changed
+
+
+def pack_inputs(buttons: list[bool], axes: list[float]) -> tuple[str, str]:
+    """Encodes inputs in the packed format. Mirrors pack_inputs in controller.js."""
+    mask = sum(1 << i for i, pressed in enumerate(buttons) if pressed)
+    quantized = array("b", (round(axis * AXIS_SCALE) for axis in axes))
+    return format(mask, "x"), b64encode(quantized.tobytes()).decode("ascii")
+
+
+Frame = tuple[float, list[tuple[int, bool]], list[tuple[int, float]]]
+
+
+def parse_batch(frames: str) -> list[Frame]:
+    """
+    Parses a batch of changes, e.g. '1690000000000.5;0:1,3:0;1:-0.5|...'. Each frame
+    is the sample time in ms since the epoch, the buttons which were pressed or
+    released, and the axes which moved.
+    """
+    result: list[Frame] = []
+    for frame in frames.split("|"):
+        timestamp, button_edges, axis_changes = frame.split(";")
+        edges = [
+            (int(index), value == "1")
+            for index, value in (
+                edge.split(":") for edge in button_edges.split(",") if edge
+            )
+        ]
+        changes = [
+            (int(index), float(value))
+            for index, value in (
+                change.split(":") for change in axis_changes.split(",") if change
+            )
+        ]
+        result.append((float(timestamp), edges, changes))
+    return result
@@ -0,0 +1,75 @@
+"""
+Measures the latency of each stage between a controller being sampled and the
+resulting action being run.
+"""
+
+# For ease of testing, this file should not import from outside the standard library.
+
+from __future__ import annotations
+
+from bisect import bisect_left
+
+# Time from the Gamepad API sampling the controller to Python receiving the message,
+# from receiving it to processing the inputs, from processing the inputs to calling
+# the action, running the action, and from the sample to the action finishing.
+STAGES = ("bridge", "poll", "dispatch", "handler", "total")
+
+# Upper bounds of the histogram buckets in ms, doubling from 1/8 ms to 4 s
+BUCKETS = tuple(0.125 * 2**i for i in range(16))
+
+
+class Histogram:
+    """A histogram of times in ms, with logarithmic buckets."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Adds a time. Negative times, from clock differences, are counted as 0."""
+        value = max(value, 0.0)
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket containing the given percentile."""
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return 0.0
+
+    def summary(self) -> str:
+        """Returns the count, mean, median, 95th percentile and maximum."""
+        if not self.count:
+            return "no samples"
+        return (
+            f"n={self.count} mean={self.total / self.count:.2f} "
+            f"p50<={self.percentile(0.5):g} p95<={self.percentile(0.95):g} "
+            f"max={self.max:.2f}"
+        )
+
+
+class LatencyMonitor:
+    """Keeps a histogram for each stage of the input path."""
+
+    def __init__(self) -> None:
+        self.histograms = {stage: Histogram() for stage in STAGES}
+
+    def record(self, stage: str, value: float) -> None:
+        """Adds a time in ms to a stage."""
+        self.histograms[stage].record(value)
+
+    def reset(self) -> None:
+        """Clears all stages."""
+        self.histograms = {stage: Histogram() for stage in STAGES}
+
+    def summary(self) -> list[str]:
+        """Returns a line summarising each stage."""
+        return [f"{stage}: {hist.summary()}" for stage, hist in self.histograms.items()]
@@ -0,0 +1,111 @@
+"""
+Writes files in a background thread, so that saving never blocks the GUI. Writes are
+debounced, so a file changed several times in quick succession is written once, and
+atomic, so a crash while writing never leaves a file half written.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+import os
+import threading
+from time import monotonic
+from typing import Callable
+
+# How long to wait for more changes before writing (seconds)
+WRITE_DELAY = 0.5
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Writes a file by replacing it, so that it is never left half written."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf8") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class BackgroundWriter:
+    """
+    Writes and removes files in a background thread, once nothing has changed for
+    delay seconds. Only the last change to each file is made. Call flush to make the
+    pending changes immediately, e.g. before reading the files, or on exit. on_error
+    is called with the path and error if a change fails.
+    """
+
+    def __init__(
+        self,
+        delay: float = WRITE_DELAY,
+        on_error: Callable[[str, OSError], None] | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.delay = delay
+        self.on_error = on_error
+        self.clock = clock
+        # The new contents of files, or None for files to remove
+        self.pending: dict[str, str | None] = {}
+        self.last_change = 0.0
+        # Whether changes taken from pending are being made
+        self.writing = False
+        self.condition = threading.Condition()
+        # Held while changes are made, so that flush waits for the thread
+        self.io_lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+
+    def write(self, path: str, text: str) -> None:
+        """Writes text to the file at path, soon."""
+        self.change(path, text)
+
+    def remove(self, path: str) -> None:
+        """Removes the file at path, soon, replacing any pending write."""
+        self.change(path, None)
+
+    def change(self, path: str, text: str | None) -> None:
+        """Queues a change to the file at path, starting the thread if needed."""
+        with self.condition:
+            self.pending[path] = text
+            self.last_change = self.clock()
+            self.condition.notify()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="contanki-writer")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def has_pending(self) -> bool:
+        """Whether there are changes which haven't been made yet, including those
+        being made by the thread."""
+        with self.condition:
+            return bool(self.pending) or self.writing
+
+    def flush(self) -> None:
+        """Makes the pending changes now, waiting for any being made by the thread.
+        Call before reading the files, as has_pending may change at any time."""
+        with self.io_lock:
+            with self.condition:
+                pending, self.pending = self.pending, {}
+                self.writing = bool(pending)
+            try:
+                for path, text in pending.items():
+                    try:
+                        if text is not None:
+                            write_atomic(path, text)
+                        elif os.path.exists(path):
+                            os.remove(path)
+                    except OSError as err:
+                        if self.on_error is not None:
+                            self.on_error(path, err)
+            finally:
+                with self.condition:
+                    self.writing = False
+
+    def run(self) -> None:
+        """Makes the pending changes once they have been left alone for delay."""
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                while (wait := self.last_change + self.delay - self.clock()) > 0:
+                    self.condition.wait(wait)
+            self.flush()
@@ -8,6 +8,7 @@ purpose of saving."""
 from __future__ import annotations
 from collections import defaultdict
 
+import atexit
 from copy import deepcopy
 import os
 from os.path import join, exists
@@ -28,7 +29,11 @@ from .utils import (
     default_profile_path,
     slugify,
 )
-from .controller import Controller, get_updated_controller_list
+from .controller import Controller, get_controller_names
+from .assignments import AssignmentStore
+from .catalog import ProfileCatalog
+from .persist import BackgroundWriter
+from .schema import validate_profile
 
 
 class Profile:
@@ -43,6 +48,7 @@ class Profile:
         "dialog",
         "config",
     ]
+    dispatch_states: list[State] = states + ["all", "NoFocus"]
 
     def __init__(self, profile: Profile | dict):
         if isinstance(profile, Profile):
@@ -58,7 +64,8 @@ class Profile:
             self.bindings = bindings
         self.quick_select: dict[str, Any] = profile["quick_select"]
         self.name: str = profile["name"]
-        self.size: tuple[int, int] = profile["size"]
+        # Converted, as some profiles were saved with the size as floats
+        self.size: tuple[int, int] = tuple(int(n) for n in profile["size"])  # type: ignore
         self.len_buttons, self.len_axes = self.size
         self.controller = profile["controller"]
         self.axes_bindings: dict[int, str] = defaultdict(str, profile["axes_bindings"])
@@ -71,6 +78,13 @@ class Profile:
                 else {i: False for i in self.axes_bindings}
             ),
         )
+        # The delay and interval in ms of buttons which repeat differently from the
+        # defaults in repeat.py, with an interval of 0 for buttons which don't repeat
+        self.repeat: dict[int, tuple[int, int]] = {
+            button: tuple(timing)  # type: ignore
+            for button, timing in profile.get("repeat", {}).items()
+        }
+        self.compile_bindings()
 
     def __repr__(self) -> str:
         return f"Profile({self.name})"
@@ -87,7 +101,7 @@ class Profile:
     def controller(self, controller: Controller | str):
         """Sets the controller."""
         if isinstance(controller, str):
-            if controller in get_updated_controller_list():
+            if controller in get_controller_names():
                 controller = Controller(controller)
             else:
                 dbg(f"Controller {controller} not found.")
@@ -96,12 +110,42 @@ class Profile:
 
     def get(self, state: State, button: int) -> str:
         """Returns the action for a button or axis."""
+        table = self.dispatch.get(state)
+        if table is not None and 0 <= button < len(table):
+            return table[button]
+        return self.resolve(state, button)
+
+    def resolve(self, state: State, button: int) -> str:
+        """Returns the action for a button or axis, falling back to the review and
+        all states when it isn't bound in the state."""
+        bindings = self.bindings
         return (
-            self.bindings[(state, button)]
+            bindings.get((state, button), "")
             or state in ("question", "answer")
-            and self.bindings[("review", button)]
-            or self.bindings[("all", button)]
+            and bindings.get(("review", button), "")
+            or bindings.get(("all", button), "")
+        )
+
+    def compile_bindings(self) -> None:
+        """Resolves the action of every button and axis in each state into a table
+        indexed by button, so that get is a single lookup."""
+        # Buttons, then the directions of axes in button mode from 100
+        size = max(
+            self.len_buttons,
+            100 + 2 * self.len_axes,
+            max((button + 1 for _, button in self.bindings), default=0),
         )
+        self.dispatch: dict[State, list[str]] = {
+            state: [self.resolve(state, button) for button in range(size)]
+            for state in self.dispatch_states
+        }
+
+    def update_dispatch(self, button: int) -> None:
+        """Updates the tables after a binding of button changes."""
+        for state, table in self.dispatch.items():
+            if button >= len(table):
+                table.extend([""] * (button + 1 - len(table)))
+            table[button] = self.resolve(state, button)
 
     def set(self, state: State, button: int, action: str) -> None:
         """Updates the binding for a button or axis."""
@@ -122,12 +166,14 @@ class Profile:
     def remove_binding(self, state: State, button: int) -> None:
         """Removes a binding."""
         del self.bindings[(state, button)]
+        self.update_dispatch(button)
 
     def update_binding(self, state: State, button: int, action: str) -> None:
         """Updates the binding for a button or axis."""
         if state not in getattr(State, "__args__"):
             raise ValueError(f"State {state} not valid.")
         self.bindings[(state, button)] = action
+        self.update_dispatch(button)
 
     def get_compatibility(self, controller):
         """To be implemented"""
@@ -140,7 +186,7 @@ class Profile:
                 bindings[state] = dict()
             bindings[state][str(button)] = action
 
-        return {
+        result = {
             "name": self.name,
             "size": self.size,
             "controller": self.controller.name,
@@ -149,6 +195,11 @@ class Profile:
             "axes_bindings": deepcopy(self.axes_bindings),
             "invert_axis": deepcopy(self.invert_axis),
         }
+        if self.repeat:
+            result["repeat"] = {
+                str(button): list(timing) for button, timing in self.repeat.items()
+            }
+        return result
 
     def to_json(self) -> str:
         """Returns the profile as a JSON string."""
@@ -185,6 +236,11 @@ class Profile:
         add_table("quick_select", self.quick_select)
         add_table("invert_axis", self.invert_axis)
         add_table("axes_bindings", self.axes_bindings)
+        if self.repeat:
+            add_table(
+                "repeat",
+                {button: list(timing) for button, timing in self.repeat.items()},
+            )
 
         _bindings = {}
         for (state, button), action in self.bindings.items():
@@ -221,30 +277,70 @@ class Profile:
     def __eq__(self, __o: object) -> bool:
         return isinstance(__o, Profile) and self.__hash__() == __o.__hash__()
 
+    def serialize(self) -> str:
+        """Returns the contents of the profile's file."""
+        return json.dumps(self.to_dict(), indent=4)
+
     def save(self) -> None:
-        """Saves the profile to a file."""
+        """Saves the profile to a file, if it has changed. The file is written in
+        the background."""
         path = os.path.join(user_profile_path, slugify(self.name))
-        with open(dbg(path), "w", encoding="utf8") as file:
-            json.dump(self.to_dict(), file, indent=4)
+        text = self.serialize()
+        if _saved.get(path) == text:
+            return
+        _writer.write(dbg(path), text)
+        _saved[path] = text
+        _profile_cache.pop(path, None)
+        _catalog.invalidate()
+
+    def copy(self) -> Profile:
+        """Returns a deep copy of the profile. The controller is shared, as it isn't
+        changed in place, which saves loading it again."""
+        profile = Profile.__new__(Profile)
+        profile.bindings = defaultdict(str, self.bindings)
+        profile.quick_select = deepcopy(self.quick_select)
+        profile.name = self.name
+        profile.size = deepcopy(self.size)
+        profile.len_buttons, profile.len_axes = self.len_buttons, self.len_axes
+        profile._controller = self._controller
+        profile.axes_bindings = defaultdict(str, self.axes_bindings)
+        profile.invert_axis = defaultdict(bool, self.invert_axis)
+        profile.repeat = dict(self.repeat)
+        profile.dispatch = {
+            state: table.copy() for state, table in self.dispatch.items()
+        }
+        return profile
+
+
+# Writes profiles in the background, see persist.py
+_writer = BackgroundWriter(
+    on_error=lambda path, err: dbg(f"Error saving '{path}'", err)
+)
+atexit.register(_writer.flush)
 
-    def copy(self):
-        """Returns a deep copy of the profile."""
-        return Profile(self.to_dict())
+# The contents of the profile files, by path, as they were loaded or last saved, so
+# that unchanged profiles aren't written again. Deleted files are forgotten.
+_saved: dict[str, str] = {}
+
+
+def _flush() -> None:
+    """Writes the profiles waiting to be saved, and waits for any being written, so
+    that they can be read."""
+    _writer.flush()
 
 
 def get_profile_list(
     compatibility: str | None = None, defaults: bool = True
 ) -> list[str]:
     """Returns a list of all profiles."""
-    files = os.listdir(user_profile_path)
-    if defaults:
-        files += os.listdir(default_profile_path)
-    profiles = [get_profile(file) for file in files if profile_is_valid(file)]
-    return sorted(profile.name for profile in profiles if profile is not None)
+    _flush()
+    entries = _catalog.profiles(None if defaults else user_profile_path)
+    return sorted(entry["name"] for entry in entries)
 
 
-def _load_profile(name: str) -> str | None:
-    """Loads a profile str from a file."""
+def _find_profile(name: str) -> str | None:
+    """Returns the path of a profile's file, if it exists."""
+    _flush()
     paths = (
         join(user_profile_path, slugify(name)),
         join(default_profile_path, slugify(name)),
@@ -253,23 +349,83 @@ def _load_profile(name: str) -> str | None:
     )
     for path in paths:
         if exists(path):
-            with open(path, "r", encoding="utf8") as file:
-                return file.read()
+            return path
     return None
 
 
+def _load_profile(name: str) -> str | None:
+    """Loads a profile str from a file."""
+    path = _find_profile(name)
+    if path is None:
+        return None
+    with open(path, "r", encoding="utf8") as file:
+        return file.read()
+
+
+# Loaded profiles, or None for invalid files, by path, with the modification time
+# and size of the file they were loaded from
+_profile_cache: dict[str, tuple[tuple[int, int], Profile | None]] = {}
+
+
+def _read_profile(path: str) -> Profile | None:
+    """Reads and validates a profile file."""
+    try:
+        with open(path, "r", encoding="utf8") as file:
+            profile = json.loads(file.read(), object_hook=int_keys)
+    except (OSError, UnicodeError, json.JSONDecodeError) as err:
+        dbg(f"Error loading '{path}': {err}")
+        return None
+    if not profile_is_valid(profile):
+        dbg(f"Profile '{path}' is not valid")
+        return None
+    result = Profile(profile)
+    _saved[path] = result.serialize()
+    return result
+
+
 def get_profile(name: str) -> Profile | None:
-    """Load a profile from a file."""
-    if profile_is_valid(name):
-        raw_profile = _load_profile(name)
-        if raw_profile is None:
-            return None
-        return Profile(json.loads(raw_profile, object_hook=int_keys))
-    return None
+    """Load a profile from a file. Files are only read again once they change, so
+    this is usually a copy from memory."""
+    if name == "placeholder" or (path := _find_profile(name)) is None:
+        return None
+    profile = _get_profile_at(path)
+    return profile.copy() if profile is not None else None
+
+
+def _get_profile_at(path: str) -> Profile | None:
+    """Returns the cached profile loaded from a path, reading it if it changed."""
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    version = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _profile_cache.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, _read_profile(path))
+        _profile_cache[path] = cached
+    return cached[1]
+
+
+def _describe_profile(path: str) -> tuple[str, str, tuple[int, int]] | None:
+    """Returns the name, controller and size of a profile file, for the catalog."""
+    profile = _get_profile_at(path)
+    if profile is None:
+        return None
+    return profile.name, str(profile.controller), tuple(profile.size)  # type: ignore
+
+
+# The names, controllers and sizes of the profiles, so that listing them doesn't
+# require loading every profile
+_catalog = ProfileCatalog(
+    join(user_files_path, "profile_catalog.json"),
+    [user_profile_path, default_profile_path],
+    _describe_profile,
+)
 
 
 def create_profile(old_name: str, new_name: str) -> Profile:
     """Create a new Profile object using an existing Profile as a template."""
+    _flush()
     if exists(join(user_profile_path, new_name)) or new_name in get_profile_list():
         raise FileExistsError(f"Error: Profile name '{new_name}' already in use")
 
@@ -282,13 +438,18 @@ def create_profile(old_name: str, new_name: str) -> Profile:
 
 
 def delete_profile(profile: str | Profile) -> None:
-    """Delete a profile from disk."""
+    """Delete a profile from disk. The file is removed in the background, after
+    any pending writes."""
     name = profile.name if isinstance(profile, Profile) else profile
     name = slugify(name)
+    _flush()
     path = join(user_profile_path, name)
     if exists(path):
         dbg(f"Deleting profile {name} from {path}")
-        os.remove(path)
+        _writer.remove(path)
+        _saved.pop(path, None)
+        _profile_cache.pop(path, None)
+        _catalog.invalidate()
     else:
         dbg(f"Tried to delete profile {name}, but not found at {path}")
         path = join(default_profile_path, name)
@@ -334,63 +495,55 @@ def find_profile(controller: str, buttons: int, axes: int) -> str:
         return str(profile)
 
     # Check if a profile named after the controller exists
-    user_profiles = get_profile_list(defaults=False)
-    if controller in user_profiles:
+    _flush()
+    entry = _catalog.find(controller)
+    if entry is not None and os.path.dirname(entry["path"]) == user_profile_path:
         dbg(f"Found profile {controller} for {controller}")
         update_assigned_profiles(controller, controller)
         return controller
 
     # No profile found, create a default profile for the controller
-    default_profiles = get_profile_list(defaults=True)
-    if controller in default_profiles:
+    if entry is not None:
         profile_to_copy = controller
-    elif f"Standard Gamepad ({buttons} Buttons {axes} Axes)" in default_profiles:
+    elif _catalog.find(f"Standard Gamepad ({buttons} Buttons {axes} Axes)"):
         profile_to_copy = f"Standard Gamepad ({buttons} Buttons {axes} Axes)"
     else:
         profile_to_copy = "Standard Gamepad (18 Buttons 4 Axes)"
     profile = copy_profile(profile_to_copy, controller)
     update_assigned_profiles(controller, profile.name)
 
-    if controller in get_updated_controller_list():
+    if controller in get_controller_names():
         profile.controller = Controller(controller)
         profile.save()
     return profile.name
 
 
+# The profiles assigned to controllers
+_assignments = AssignmentStore(
+    join(user_files_path, "controllers"),
+    lambda err: dbg("Error reading or saving assigned profiles", err),
+)
+
+
 def update_assigned_profiles(controller: Controller | str, profile: Profile | str):
     """Update the controllers file with the profile."""
-    profile = str(profile)
-    controller = str(controller)
-    with open(join(user_files_path, "controllers"), "r", encoding="utf8") as file:
-        controllers = json.load(file)
-    if profile:
-        controllers[controller] = profile
-    else:
-        del controllers[controller]
-    with open(join(user_files_path, "controllers"), "w", encoding="utf8") as file:
-        json.dump(controllers, file)
+    _assignments.set(str(controller), str(profile))
 
 
 def get_assigned_profile(controller: Controller | str) -> Profile | None:
     """Get a list of profiles assigned to controllers."""
-    controller = str(controller)
-    assigned_profiles = get_assigned_profiles()
-    if controller in assigned_profiles:
-        return get_profile(assigned_profiles[controller])
-    return None
+    name = _assignments.get(str(controller))
+    return get_profile(name) if name is not None else None
 
 
 def get_assigned_profiles() -> dict[str, str]:
     """Get a list of profiles assigned to controllers."""
-    with open(join(user_files_path, "controllers"), "r", encoding="utf8") as file:
-        return json.load(file)
+    return _assignments.get_all()
 
 
 def profile_is_valid(profile: Profile | dict | str | None) -> bool:
     """Checks that a profile is valid."""
     if isinstance(profile, str):
-        if profile is None:
-            return False
         if profile == "placeholder":
             return False
         try:
@@ -402,7 +555,7 @@ def profile_is_valid(profile: Profile | dict | str | None) -> bool:
             dbg(f"Profile '{profile}' not found")
             return False
         try:
-            profile = json.loads(profile, object_hook=int_keys)
+            profile = json.loads(profile)
         except json.JSONDecodeError:
             dbg(f"Profile '{profile}' is not valid JSON")
             return False
@@ -413,38 +566,8 @@ def profile_is_valid(profile: Profile | dict | str | None) -> bool:
             dbg(err)
             return False
 
-    if not isinstance(profile, dict):
-        dbg(dbg(f"Profile '{profile}' not of type dict"))
-        return False
-
-    profile = int_keys(profile)
-
-    for key in [
-        "name",
-        "size",
-        "controller",
-        "quick_select",
-        "bindings",
-        "axes_bindings",
-    ]:
-        if key not in profile:
-            dbg(f"Profile '{profile['name']}' is missing required key {key}")
-            return False
-    for state, value in profile["bindings"].items():
-        if state not in getattr(State, "__args__"):
-            dbg(f"Profile '{profile['name']}' has invalid state '{state}'")
-            return False
-        if not isinstance(value, dict):
-            dbg(f"Profile '{profile['name']}' has invalid value {value} for '{state}'")
-            return False
-    try:
-        Controller(profile["controller"])
-    except ValueError as err:
-        dbg(err)
-        return False
-    try:
-        profile = Profile(profile)
-    except Exception as err:
-        dbg(f"Profile '{profile}' returned error: {err}")
-        return False
-    return True
+    errors = validate_profile(profile, get_controller_names())
+    for error in errors:
+        name = profile.get("name") if isinstance(profile, dict) else None
+        dbg(f"Profile '{name}' is not valid: {error}")
+    return not errors
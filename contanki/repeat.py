@@ -0,0 +1,109 @@
+"""
+Repeats navigation actions while their button is held, like a key on a keyboard, on
+a timer of its own so that it doesn't depend on how often the controller is polled.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import Any, Callable
+
+from .utils import State
+
+# Actions which repeat while held by default, and the delay before the first repeat
+# and the interval between repeats in ms. Profiles can set these for each button.
+REPEAT_ACTIONS = {
+    "Select Next",
+    "Select Previous",
+    "Up",
+    "Down",
+    "Up by 10",
+    "Down by 10",
+    "Scroll Up",
+    "Scroll Down",
+    "Next Deck",
+    "Previous Deck",
+    "Next Due Deck",
+    "Previous Due Deck",
+}
+REPEAT_DELAY = 400
+REPEAT_INTERVAL = 80
+
+
+def get_repeat(
+    repeat: dict[int, tuple[int, int]], button: int, action: str
+) -> tuple[int, int] | None:
+    """Returns the delay and interval in ms with which the action of a held button
+    repeats, from the profile's repeat settings, or None if it doesn't repeat."""
+    if button in repeat:
+        delay, interval = repeat[button]
+        return (delay, interval) if interval > 0 else None
+    if action in REPEAT_ACTIONS:
+        return REPEAT_DELAY, REPEAT_INTERVAL
+    return None
+
+
+class RepeatEngine:
+    """
+    Calls fire with the state and action of each held button when it is due to
+    repeat. One single shot timer, a QTimer, is started for whichever button is due
+    next, so nothing runs while no button is held.
+    """
+
+    def __init__(
+        self,
+        timer: Any,
+        fire: Callable[[State, str], None],
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.timer = timer
+        self.fire = fire
+        self.clock = clock
+        # The state, action, time of the next repeat and interval of held buttons
+        self.held: dict[int, tuple[State, str, float, float]] = {}
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    def press(
+        self, button: int, state: State, action: str, delay: int, interval: int
+    ) -> None:
+        """Starts repeating action every interval ms, starting delay ms from now."""
+        self.held[button] = (
+            state,
+            action,
+            self.clock() + delay / 1000,
+            interval / 1000,
+        )
+        self.schedule()
+
+    def release(self, button: int) -> None:
+        """Stops repeating the action of a button."""
+        if self.held.pop(button, None) is not None:
+            self.schedule()
+
+    def clear(self) -> None:
+        """Stops all repeats, e.g. when the controller disconnects."""
+        self.held.clear()
+        self.timer.stop()
+
+    def tick(self) -> None:
+        """Fires the repeats which are due."""
+        now = self.clock()
+        for button, (state, action, due, interval) in list(self.held.items()):
+            if due > now or button not in self.held:
+                continue
+            # Repeats missed while Anki was busy are dropped rather than bunched up
+            due = due + interval if due + interval > now else now + interval
+            self.held[button] = (state, action, due, interval)
+            self.fire(state, action)
+        self.schedule()
+
+    def schedule(self) -> None:
+        """Starts the timer for the next repeat, or stops it if there is none."""
+        if not self.held:
+            self.timer.stop()
+            return
+        due = min(due for _, _, due, _ in self.held.values())
+        self.timer.start(max(0, round((due - self.clock()) * 1000)))
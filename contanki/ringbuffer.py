@@ -0,0 +1,228 @@
+"""
+A ring buffer of fixed-size input records in a memory-mapped file, used to pass
+controller input from the input daemon to Anki without either process blocking.
+"""
+
+# This file is also imported by the input daemon outside of Anki, so it should not
+# import from outside the standard library.
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import NamedTuple
+
+MAGIC = b"CTKR"
+VERSION = 1
+MAX_AXES = 8
+
+# magic, version, capacity, record size, writer id, write index, and the number of
+# buttons, number of axes and name of the connected controller
+HEADER = struct.Struct("<4sIIIQQBB6x64s")
+WRITE_INDEX_OFFSET = 24
+CONTROLLER = struct.Struct("<BB6x64s")
+CONTROLLER_OFFSET = 32
+# time, kind, number of buttons, number of axes, button bitmask, axes, name
+RECORD = struct.Struct(f"<dBBB5xQ{MAX_AXES}f64s")
+
+STATE, CONNECT, DISCONNECT = 0, 1, 2
+
+
+class InputRecord(NamedTuple):
+    """A controller connecting or disconnecting, or the state of its inputs."""
+
+    time: float
+    kind: int
+    num_buttons: int
+    num_axes: int
+    buttons: int
+    axes: tuple[float, ...]
+    name: str = ""
+
+    def button_list(self) -> list[bool]:
+        """Returns the buttons as a list."""
+        return [bool(self.buttons >> i & 1) for i in range(self.num_buttons)]
+
+    def axis_list(self) -> list[float]:
+        """Returns the axes as a list."""
+        return list(self.axes[: self.num_axes])
+
+
+def default_ring_path() -> str:
+    """Returns the path of the ring buffer, in shared memory where available."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "contanki-input")
+
+
+class RingWriter:
+    """Writes records to the ring buffer. There must only be one writer."""
+
+    def __init__(self, path: str, capacity: int = 256) -> None:
+        self.capacity = capacity
+        size = HEADER.size + capacity * RECORD.size
+        # Write to a new file and rename it, so readers never see a partial header
+        temp_path = f"{path}.{os.getpid()}"
+        with open(temp_path, "wb") as file:
+            file.write(b"\0" * size)
+        self.file = open(temp_path, "r+b")  # pylint: disable=consider-using-with
+        self.map = mmap.mmap(self.file.fileno(), size)
+        writer_id = int.from_bytes(os.urandom(8), sys.byteorder)
+        HEADER.pack_into(
+            self.map, 0, MAGIC, VERSION, capacity, RECORD.size, writer_id, 0, 0, 0, b""
+        )
+        os.replace(temp_path, path)
+        self.index = 0
+
+    def write(self, record: InputRecord) -> None:
+        """Writes a record. The oldest records are overwritten when full."""
+        axes = tuple(record.axes[:MAX_AXES]) + (0.0,) * (MAX_AXES - len(record.axes))
+        offset = HEADER.size + (self.index % self.capacity) * RECORD.size
+        RECORD.pack_into(
+            self.map,
+            offset,
+            record.time,
+            record.kind,
+            record.num_buttons,
+            min(record.num_axes, MAX_AXES),
+            record.buttons,
+            *axes,
+            record.name.encode("utf8")[:64],
+        )
+        # Publish the record only once it has been written
+        self.index += 1
+        struct.pack_into("<Q", self.map, WRITE_INDEX_OFFSET, self.index)
+        # Readers which start later need the controller, as its record may be gone
+        if record.kind == CONNECT:
+            CONTROLLER.pack_into(
+                self.map,
+                CONTROLLER_OFFSET,
+                record.num_buttons,
+                record.num_axes,
+                record.name.encode("utf8")[:64],
+            )
+        elif record.kind == DISCONNECT:
+            CONTROLLER.pack_into(self.map, CONTROLLER_OFFSET, 0, 0, b"")
+
+    def close(self) -> None:
+        """Closes the ring buffer."""
+        self.map.close()
+        self.file.close()
+
+
+class RingReader:
+    """Reads new records from the ring buffer, never blocking on the writer."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.map: mmap.mmap | None = None
+        self.inode = 0
+        self.writer_id = 0
+        self.capacity = 0
+        self.index = 0
+        self.dropped = 0
+        self.pending: list[InputRecord] = []
+
+    def open(self) -> bool:
+        """Maps the ring buffer, if a writer has created one."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.close()
+            return False
+        if self.map is not None and stat.st_ino == self.inode:
+            return True
+        self.close()
+        with open(self.path, "rb") as file:
+            try:
+                _map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return False
+        if len(_map) < HEADER.size:
+            _map.close()
+            return False
+        (
+            magic,
+            version,
+            capacity,
+            record_size,
+            writer_id,
+            index,
+            num_buttons,
+            num_axes,
+            name,
+        ) = HEADER.unpack_from(_map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            _map.close()
+            return False
+        restarted = self.writer_id not in (0, writer_id)
+        self.map, self.inode = _map, stat.st_ino
+        self.capacity, self.writer_id = capacity, writer_id
+        self.pending = []
+        if restarted and index <= capacity:
+            # The writer was replaced since the last read, so all of its records
+            # are new
+            self.index = 0
+            return True
+        # Older records are stale, so start from the connected controller and its
+        # latest state
+        self.index = index
+        if num_buttons or num_axes:
+            self.pending.append(
+                InputRecord(
+                    0.0, CONNECT, num_buttons, num_axes, 0, (), decode_name(name)
+                )
+            )
+            if index and (latest := self.read_record(index - 1)).kind == STATE:
+                self.pending.append(latest)
+        return True
+
+    def close(self) -> None:
+        """Unmaps the ring buffer."""
+        if self.map is not None:
+            self.map.close()
+        self.map = None
+        self.inode = 0
+
+    def read(self) -> list[InputRecord]:
+        """Returns the records written since the last read."""
+        if not self.open():
+            return []
+        assert self.map is not None
+        # The writer may be part way through writing record head, in the slot of
+        # record head - capacity, so only the records after that one are whole
+        (head,) = struct.unpack_from("<Q", self.map, WRITE_INDEX_OFFSET)
+        if head - self.index >= self.capacity:
+            # The writer has lapped us, skip the records that were overwritten
+            self.dropped += head - self.index - self.capacity + 1
+            self.index = head - self.capacity + 1
+        records = [self.read_record(index) for index in range(self.index, head)]
+        # Drop any records which were overwritten while we were reading them
+        (new_head,) = struct.unpack_from("<Q", self.map, WRITE_INDEX_OFFSET)
+        if new_head - self.index >= self.capacity:
+            overwritten = min(new_head - self.index - self.capacity + 1, len(records))
+            self.dropped += overwritten
+            records = records[overwritten:]
+        self.index = head
+        if self.pending:
+            records = self.pending + records
+            self.pending = []
+        return records
+
+    def read_record(self, index: int) -> InputRecord:
+        """Reads the record at index, which may have been overwritten."""
+        assert self.map is not None
+        offset = HEADER.size + (index % self.capacity) * RECORD.size
+        time, kind, num_buttons, num_axes, buttons, *axes, name = RECORD.unpack_from(
+            self.map, offset
+        )
+        return InputRecord(
+            time, kind, num_buttons, num_axes, buttons, tuple(axes), decode_name(name)
+        )
+
+
+def decode_name(name: bytes) -> str:
+    """Decodes a null padded controller name."""
+    return name.rstrip(b"\0").decode("utf8", "replace")
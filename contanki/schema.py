@@ -0,0 +1,187 @@
+"""
+Validates profiles in one pass, against a declarative schema, returning where and
+why a profile is invalid rather than whether building a Profile from it throws.
+Checks return None when a value is valid, so valid profiles allocate nothing.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from typing import Any, Callable, Collection, NamedTuple
+
+from .utils import State
+
+
+class ValidationError(NamedTuple):
+    """Why a value is invalid, and where, as the keys leading to it."""
+
+    path: tuple[str | int, ...]
+    message: str
+
+    def __str__(self) -> str:
+        if not self.path:
+            return self.message
+        return ".".join(str(key) for key in self.path) + ": " + self.message
+
+
+Check = Callable[[Any], "list[ValidationError] | None"]
+
+
+def _error(message: str) -> list[ValidationError]:
+    return [ValidationError((), message)]
+
+
+def _prefix(key: str | int, errors: list[ValidationError]) -> list[ValidationError]:
+    return [ValidationError((key,) + error.path, error.message) for error in errors]
+
+
+def of_type(kind: type, description: str) -> Check:
+    """Checks that a value is of a type. bool isn't accepted as an int."""
+
+    def check(value: Any) -> list[ValidationError] | None:
+        if isinstance(value, kind) and (kind is bool or not isinstance(value, bool)):
+            return None
+        return _error(f"expected {description}, got {type(value).__name__}")
+
+    return check
+
+
+def whole_number(value: Any) -> list[ValidationError] | None:
+    """Checks that a value is an int, or a float without a fraction, as some
+    profiles were saved with."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return None
+    return _error(f"expected an integer, got {value!r}")
+
+
+def nullable(check: Check) -> Check:
+    """Checks that a value is None, or passes check."""
+
+    def _check(value: Any) -> list[ValidationError] | None:
+        return None if value is None else check(value)
+
+    return _check
+
+
+def int_key(value: Any) -> list[ValidationError] | None:
+    """Checks that a value is an int, or a str of one, as in JSON keys."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        try:
+            int(value)
+        except ValueError:
+            pass
+        else:
+            return None
+    return _error(f"expected an integer, got {value!r}")
+
+
+def one_of(values: Collection[Any], description: str) -> Check:
+    """Checks that a value is one of values."""
+    allowed = frozenset(values)
+
+    def check(value: Any) -> list[ValidationError] | None:
+        if isinstance(value, str) and value in allowed:
+            return None
+        return _error(f"expected {description}, got {value!r}")
+
+    return check
+
+
+def sequence(item: Check, length: int | None = None) -> Check:
+    """Checks that a value is a list or tuple of items, optionally of a length."""
+
+    def check(value: Any) -> list[ValidationError] | None:
+        if not isinstance(value, (list, tuple)):
+            return _error(f"expected a list, got {type(value).__name__}")
+        if length is not None and len(value) != length:
+            return _error(f"expected {length} items, got {len(value)}")
+        errors = None
+        for index, element in enumerate(value):
+            if (error := item(element)) is not None:
+                errors = (errors or []) + _prefix(index, error)
+        return errors
+
+    return check
+
+
+def mapping(key: Check, value: Check, non_empty: bool = False) -> Check:
+    """Checks that a value is a dict of keys to values."""
+
+    def check(data: Any) -> list[ValidationError] | None:
+        if not isinstance(data, dict):
+            return _error(f"expected a table, got {type(data).__name__}")
+        if non_empty and not data:
+            return _error("expected at least one entry")
+        errors = None
+        for _key, _value in data.items():
+            if (error := key(_key)) is not None:
+                errors = (errors or []) + _prefix(_key, error)
+            elif (error := value(_value)) is not None:
+                errors = (errors or []) + _prefix(_key, error)
+        return errors
+
+    return check
+
+
+def record(required: dict[str, Check], optional: dict[str, Check]) -> Check:
+    """Checks that a value is a dict with the required keys, and optionally the
+    optional ones. Other keys are allowed, for forward compatibility."""
+
+    def check(data: Any) -> list[ValidationError] | None:
+        if not isinstance(data, dict):
+            return _error(f"expected a table, got {type(data).__name__}")
+        errors = None
+        for key, _check in required.items():
+            if key not in data:
+                errors = (errors or []) + _prefix(key, _error("missing"))
+            elif (error := _check(data[key])) is not None:
+                errors = (errors or []) + _prefix(key, error)
+        for key, _check in optional.items():
+            if key in data and (error := _check(data[key])) is not None:
+                errors = (errors or []) + _prefix(key, error)
+        return errors
+
+    return check
+
+
+string = of_type(str, "a string")
+integer = of_type(int, "an integer")
+boolean = of_type(bool, "true or false")
+state = one_of(getattr(State, "__args__"), "a state")
+
+PROFILE_SCHEMA = record(
+    {
+        "name": string,
+        "size": sequence(whole_number, length=2),
+        "controller": string,
+        "quick_select": record({}, {"actions": mapping(state, sequence(string))}),
+        # Actions may be null, which Profile treats as unbound
+        "bindings": mapping(state, mapping(int_key, nullable(string)), non_empty=True),
+        "axes_bindings": mapping(int_key, string),
+    },
+    {
+        "invert_axis": mapping(int_key, boolean),
+        "repeat": mapping(int_key, sequence(integer, length=2)),
+    },
+)
+
+
+def validate_profile(
+    profile: Any, controllers: Collection[str] | None = None
+) -> list[ValidationError]:
+    """Returns what is wrong with a profile dict, as loaded from JSON or TOML, or an
+    empty list if it is valid. The controller must be one of controllers, if given."""
+    errors = PROFILE_SCHEMA(profile) or []
+    if controllers is not None and not errors:
+        if profile["controller"] not in controllers:
+            errors.append(
+                ValidationError(
+                    ("controller",), f"unknown controller {profile['controller']!r}"
+                )
+            )
+    return errors
@@ -0,0 +1,58 @@
+"""
+Keeps the geometry of the screens, updated when screens are added, removed or
+changed, so that moving the cursor doesn't have to ask Qt about every screen.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+# x, y, width, height
+Rect = tuple[int, int, int, int]
+
+
+class ScreenTopology:
+    """Finds the screen a point is on, checking the last screen found first, as the
+    cursor is almost always on the same screen as last time."""
+
+    def __init__(self, screens: list[Rect] | None = None) -> None:
+        self.screens: list[Rect] = []
+        self.last = 0
+        self.set_screens(screens or [])
+
+    def set_screens(self, screens: list[Rect]) -> None:
+        """Replaces the geometry of the screens."""
+        self.screens = list(screens)
+        self.last = 0
+
+    def screen_at(self, x: int, y: int) -> Rect | None:
+        """Returns the screen which contains the point, if any."""
+        screens = self.screens
+        if self.last < len(screens):
+            left, top, width, height = screen = screens[self.last]
+            if left <= x < left + width and top <= y < top + height:
+                return screen
+        for i, screen in enumerate(screens):
+            left, top, width, height = screen
+            if left <= x < left + width and top <= y < top + height:
+                self.last = i
+                return screen
+        return None
+
+    def move(
+        self, x: int, y: int, delta_x: float, delta_y: float
+    ) -> tuple[int, int] | None:
+        """Returns where the cursor at x, y moves to, which may be on another screen
+        but is never off screen, or None if the cursor isn't on a screen."""
+        screen = self.screen_at(x, y)
+        if screen is None:
+            return None
+        new_x, new_y = int(x + delta_x), int(y + delta_y)
+        if self.screen_at(new_x, new_y) is not None:
+            return new_x, new_y
+        # Keep the cursor on the screen it was on
+        left, top, width, height = screen
+        return (
+            min(max(new_x, left), left + width - 1),
+            min(max(new_y, top), top + height - 1),
+        )
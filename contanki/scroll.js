@@ -0,0 +1,56 @@
+// Scrolls the page smoothly at the velocity set by Contanki. Injected into Anki's
+// main webview, so that Python only has to send changes of velocity.
+(function () {
+   if (window.contankiScroll) {
+      return;
+   }
+   // Scrolling stops if the velocity isn't refreshed for this long (ms)
+   const STALE_AFTER = 500;
+   let velocity_x = 0, velocity_y = 0;
+   let remainder_x = 0, remainder_y = 0;
+   let last_frame = null, last_update = 0, frame = null;
+
+   function step(now) {
+      if (now - last_update > STALE_AFTER) {
+         stop();
+         return;
+      }
+      const elapsed = last_frame === null ? 0 : (now - last_frame) / 1000;
+      last_frame = now;
+      remainder_x += velocity_x * elapsed;
+      remainder_y += velocity_y * elapsed;
+      const x = Math.trunc(remainder_x), y = Math.trunc(remainder_y);
+      if (x || y) {
+         remainder_x -= x;
+         remainder_y -= y;
+         window.scrollBy(x, y);
+      }
+      frame = window.requestAnimationFrame(step);
+   }
+
+   function stop() {
+      velocity_x = velocity_y = remainder_x = remainder_y = 0;
+      last_frame = null;
+      if (frame !== null) {
+         window.cancelAnimationFrame(frame);
+         frame = null;
+      }
+   }
+
+   window.contankiScroll = {
+      // Sets the velocity in pixels per second, stopping for 0, 0
+      set: function (x, y) {
+         if (!x && !y) {
+            stop();
+            return;
+         }
+         velocity_x = x;
+         velocity_y = y;
+         last_update = performance.now();
+         if (frame === null) {
+            frame = window.requestAnimationFrame(step);
+         }
+      },
+      stop: stop,
+   };
+})();
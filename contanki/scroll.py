@@ -0,0 +1,50 @@
+"""
+Sends the scroll velocity to scroll.js, which scrolls the main window's page at
+display refresh rate, instead of evaluating a scroll for every poll.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from time import monotonic
+from typing import Callable
+
+# Changes in velocity smaller than this fraction are not sent
+CHANGE_THRESHOLD = 0.1
+# A steady velocity is sent again this often (seconds), as scroll.js stops scrolling
+# if it hears nothing for 500 ms, e.g. if Anki lost focus while scrolling
+KEEP_ALIVE = 0.2
+
+
+class SmoothScroller:
+    """Passes JavaScript which sets the scroll velocity, in pixels per second, to
+    send, e.g. mw.web.eval, when the velocity changes."""
+
+    def __init__(
+        self, send: Callable[[str], None], clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.send = send
+        self.clock = clock
+        self.velocity = (0.0, 0.0)
+        self.last_sent = 0.0
+
+    def set_velocity(self, x: float, y: float) -> None:
+        """Sets the scroll velocity, stopping for 0, 0."""
+        old_x, old_y = self.velocity
+        now = self.clock()
+        if not x and not y:
+            if not old_x and not old_y:
+                return
+        elif (
+            abs(x - old_x) + abs(y - old_y) <= CHANGE_THRESHOLD * (abs(x) + abs(y))
+            and now - self.last_sent < KEEP_ALIVE
+        ):
+            return
+        self.velocity = (x, y)
+        self.last_sent = now
+        self.send(f"window.contankiScroll && contankiScroll.set({x:.6g}, {y:.6g})")
+
+    def stop(self) -> None:
+        """Stops scrolling."""
+        self.set_velocity(0.0, 0.0)
@@ -0,0 +1,63 @@
+"""
+Tracks the state of Anki from its hooks and focus changes, so that the current
+state can be read without querying Qt on every poll.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from .utils import State
+
+
+class StateTracker:
+    """
+    Keeps the current State, which is 'question' or 'answer' rather than 'review'
+    while reviewing, and 'NoFocus' when no window Contanki acts in has focus.
+    """
+
+    def __init__(self) -> None:
+        self.window: str | None = None
+        self.main_state = "startup"
+        self.reviewer_state = "question"
+        self.state: State = "NoFocus"
+
+    def sync(
+        self, window: str | None, main_state: str, reviewer_state: str | None
+    ) -> None:
+        """Sets everything at once, e.g. from the main window on startup."""
+        self.window = window
+        self.main_state = main_state
+        if reviewer_state is not None:
+            self.reviewer_state = reviewer_state
+        self.update()
+
+    def set_window(self, window: str | None) -> None:
+        """Called when focus moves to the window with this object name, or None when
+        Anki loses focus."""
+        self.window = window
+        self.update()
+
+    def set_main_state(self, main_state: str) -> None:
+        """Called when the main window changes state, e.g. to 'review'."""
+        self.main_state = main_state
+        self.update()
+
+    def set_reviewer_state(self, reviewer_state: str) -> None:
+        """Called when the reviewer shows a question or an answer."""
+        self.reviewer_state = reviewer_state
+        self.update()
+
+    def update(self) -> None:
+        """Works out the current state."""
+        if self.window == "MainWindow":
+            state = self.main_state
+            if state == "review":
+                state = self.reviewer_state
+            self.state = state  # type: ignore
+        elif self.window == "Preferences":
+            self.state = "dialog"
+        elif self.window == "Contanki Options":
+            self.state = "config"
+        else:
+            self.state = "NoFocus"
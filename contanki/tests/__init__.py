@@ -18,7 +18,30 @@ def run_tests():
         print("WARNING: assertions are not enabled, tests will not run")
         return
 
-    from . import test_controller, test_profile, test_utils, test_icons
+    from . import (
+        test_controller,
+        test_profile,
+        test_utils,
+        test_icons,
+        test_inputs,
+        test_backends,
+        test_ringbuffer,
+        test_trace,
+        test_latency,
+        test_engine,
+        test_state,
+        test_axes,
+        test_executor,
+        test_repeat,
+        test_cursor,
+        test_scroll,
+        test_screens,
+        test_transforms,
+        test_catalog,
+        test_schema,
+        test_persist,
+        test_assignments,
+    )
     passed = list()
     failed = list()
     for key, _test in tests.items():
@@ -0,0 +1,36 @@
+# pylint: disable=missing-docstring
+
+import json
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from ..assignments import AssignmentStore
+from . import test
+
+
+@test
+def test_assignment_store():
+    with TemporaryDirectory() as directory:
+        path = join(directory, "controllers")
+        errors = []
+        store = AssignmentStore(path, errors.append)
+        # A missing file has no assignments
+        assert store.get("DualShock 4") is None and not errors
+        store.set("DualShock 4", "Mine")
+        store.set("Xbox 360", "Other")
+        assert store.get("DualShock 4") == "Mine"
+        with open(path, "r", encoding="utf8") as file:
+            assert json.load(file) == {"DualShock 4": "Mine", "Xbox 360": "Other"}
+        store.set("Xbox 360", "")
+        store.set("Not Assigned", "")
+        assert store.get_all() == {"DualShock 4": "Mine"}
+
+        # Changes to the file by something else are read
+        with open(path, "w", encoding="utf8") as file:
+            json.dump({"DualShock 4": "Edited Elsewhere"}, file)
+        assert store.get("DualShock 4") == "Edited Elsewhere"
+        assert AssignmentStore(path).get("DualShock 4") == "Edited Elsewhere"
+
+        with open(path, "w", encoding="utf8") as file:
+            file.write("[")
+        assert store.get_all() == {} and len(errors) == 1
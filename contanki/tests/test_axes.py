@@ -0,0 +1,43 @@
+# pylint: disable=missing-docstring
+
+from ..axes import AxisPipeline, compile_router, quad_curve
+from . import test
+
+CONFIG = {
+    "Cursor Speed": 10,
+    "Cursor Acceleration": 10,
+    "Scroll Speed": 10,
+    "Stick Deadzone": 5,
+}
+BINDINGS = {
+    0: "Buttons",
+    1: "Scroll Vertical",
+    2: "Cursor Horizontal",
+    3: "Cursor Vertical",
+    4: "Cursor Horizontal",
+}
+
+
+@test
+def test_compile_router():
+    router = compile_router([[(2, 1.0)], [(3, -1.0)], [], [(1, 1.0), (0, -1.0)]])
+    assert router([1.0, 2.0, 3.0, 4.0]) == (3.0, -4.0, 0.0, 1.0)
+    router = compile_router([[(2, 1.0)], [(3, -1.0)], [], [(1, 1.0)]])
+    assert router([1.0, 2.0, 3.0, 4.0]) == (3.0, -4.0, 0.0, 2.0)
+    assert compile_router([[], [], [], []])([]) == (0.0, 0.0, 0.0, 0.0)
+
+
+@test
+def test_axis_pipeline():
+    pipeline = AxisPipeline(BINDINGS, {3: True}, 5, CONFIG)
+    assert pipeline.button_axes == [0]
+    # Axes bound to the same target add up, and inverted axes are negated
+    assert pipeline.route([0.9, 0.5, 0.1, 0.2, 0.1]) == (0.2, -0.2, 0.0, 0.5)
+    cursor, scroll = pipeline.process([0.9, 0.5, 0.1, 0.2, 0.1])
+    assert cursor == (0.2, -0.2)
+    assert scroll == (0.0, quad_curve(0.5))
+    # Within the deadzone
+    assert pipeline.process([0.9, 0.02, 0.01, 0.0, 0.01]) == (None, None)
+    # Controllers which report a different number of axes are handled
+    assert pipeline.route([0.0, 0.5, 0.1]) == (0.1, 0.0, 0.0, 0.5)
+    assert pipeline.num_axes == 3
@@ -0,0 +1,137 @@
+# pylint: disable=missing-docstring
+
+import os
+import time
+from types import SimpleNamespace
+
+from ..backends import (
+    ABS_HAT0X,
+    ABS_X,
+    ABS_Z,
+    BTN_EAST,
+    BTN_SOUTH,
+    EV_ABS,
+    EV_KEY,
+    EV_SYN,
+    SYN_REPORT,
+    EvdevBackend,
+    EvdevMapping,
+    controller_id,
+    evdev,
+)
+from ..controller import parse_controller_id
+from . import test
+
+
+@test
+def test_evdev_mapping():
+    mapping = EvdevMapping({ABS_X: (-32768, 32767), ABS_Z: (0, 255)})
+    assert not mapping.handle_event(EV_KEY, BTN_SOUTH, 1)
+    assert mapping.handle_event(EV_SYN, SYN_REPORT, 0)
+    assert mapping.buttons[0]
+    assert not mapping.handle_event(EV_SYN, SYN_REPORT, 0)  # nothing changed
+
+    mapping.handle_event(EV_ABS, ABS_X, 32767)
+    mapping.handle_event(EV_ABS, ABS_Z, 255)
+    mapping.handle_event(EV_ABS, ABS_HAT0X, -1)
+    assert mapping.handle_event(EV_SYN, SYN_REPORT, 0)
+    assert mapping.axes[0] == 1.0
+    assert mapping.buttons[6]  # trigger
+    assert mapping.buttons[14] and not mapping.buttons[15]  # d-pad left
+    assert mapping.is_active()
+
+    mapping.handle_event(EV_KEY, BTN_SOUTH, 0)
+    mapping.handle_event(EV_ABS, ABS_X, 0)
+    mapping.handle_event(EV_ABS, ABS_Z, 0)
+    mapping.handle_event(EV_ABS, ABS_HAT0X, 0)
+    assert mapping.handle_event(EV_SYN, SYN_REPORT, 0)
+    assert not mapping.is_active()
+
+
+@test
+def test_controller_id():
+    con_id = controller_id("Wireless Controller", 0x054C, 0x05C4)
+    assert parse_controller_id(con_id) == ("054c", "05c4")
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+
+@test
+def test_evdev_backend_with_uinput():
+    if not EvdevBackend.is_available() or not os.access("/dev/uinput", os.W_OK):
+        return
+    ecodes = evdev.ecodes
+    gamepad = evdev.UInput(
+        {
+            ecodes.EV_KEY: [BTN_SOUTH, BTN_EAST],
+            ecodes.EV_ABS: [(ABS_X, evdev.AbsInfo(0, -32768, 32767, 16, 128, 0))],
+        },
+        name="Contanki Test Gamepad",
+        vendor=0x054C,
+        product=0x05C4,
+    )
+    target = Recorder()
+    backend = EvdevBackend(target, lambda func: func())
+    try:
+        time.sleep(0.5)
+        backend.start()
+        for _ in range(20):
+            if any(name == "on_connect" for name, _ in target.calls):
+                break
+            time.sleep(0.1)
+        gamepad.write(EV_KEY, BTN_EAST, 1)
+        gamepad.syn()
+        time.sleep(0.3)
+    finally:
+        backend.stop()
+        gamepad.close()
+    polls = [args for name, args in target.calls if name == "poll_inputs"]
+    assert polls and polls[-1][0][1]
+
+
+class FakeDevice:
+    """A device which is always readable, but has no events the first time."""
+
+    def __init__(self, backend: EvdevBackend) -> None:
+        self.backend = backend
+        self.fd, self.write_fd = os.pipe()
+        os.write(self.write_fd, b"\0")
+        self.name = "Fake Gamepad"
+        self.info = SimpleNamespace(vendor=0, product=0)
+        self.reads = 0
+
+    def capabilities(self):
+        return {}
+
+    def read(self):
+        self.reads += 1
+        if self.reads == 1:
+            raise BlockingIOError
+        self.backend.running.clear()
+        return []
+
+    def close(self):
+        os.close(self.fd)
+        os.close(self.write_fd)
+
+
+@test
+def test_evdev_backend_no_data():
+    target = Recorder()
+    backend = EvdevBackend(target, lambda func: func())
+    device = FakeDevice(backend)
+    backend.device = device
+    backend.running.set()
+    try:
+        backend.read_device(device)
+    finally:
+        device.close()
+    # No data isn't a disconnect
+    assert device.reads == 2
+    assert [name for name, _ in target.calls] == ["on_connect", "poll_inputs"]
@@ -0,0 +1,81 @@
+# pylint: disable=missing-docstring
+
+from __future__ import annotations
+
+import json
+import os
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from ..catalog import ProfileCatalog
+from . import test
+
+
+def write_profile(path: str, name: str, controller: str = "DualShock 4") -> None:
+    with open(path, "w", encoding="utf8") as file:
+        json.dump({"name": name, "controller": controller, "size": [18, 4]}, file)
+
+
+class Describe:
+    """Reads the fake profiles written by write_profile, counting the reads."""
+
+    def __init__(self) -> None:
+        self.reads: list[str] = []
+
+    def __call__(self, path: str) -> tuple[str, str, tuple[int, int]] | None:
+        self.reads.append(os.path.basename(path))
+        try:
+            with open(path, "r", encoding="utf8") as file:
+                data = json.load(file)
+        except ValueError:
+            return None
+        return data["name"], data["controller"], tuple(data["size"])  # type: ignore
+
+
+@test
+def test_profile_catalog():
+    with TemporaryDirectory() as root:
+        user, default = join(root, "user"), join(root, "default")
+        os.mkdir(user)
+        os.mkdir(default)
+        write_profile(join(user, "mine"), "Mine")
+        write_profile(join(default, "standard"), "Standard")
+        write_profile(join(default, "mine"), "Mine")
+        with open(join(default, "broken"), "w", encoding="utf8") as file:
+            file.write("{")
+        describe = Describe()
+        catalog = ProfileCatalog(join(root, "catalog.json"), [user, default], describe)
+        assert sorted(entry["name"] for entry in catalog.profiles()) == [
+            "Mine",
+            "Mine",
+            "Standard",
+        ]
+        assert [entry["name"] for entry in catalog.profiles(user)] == ["Mine"]
+        entry = catalog.find("Mine")
+        assert entry is not None and entry["path"] == join(user, "mine")
+        assert entry["slug"] == "mine" and entry["controller"] == "DualShock 4"
+        assert entry["size"] == [18, 4]
+        assert catalog.find("broken") is None
+        # The second file with the same contents isn't read
+        assert sorted(describe.reads) == ["broken", "mine", "standard"]
+
+        # Nothing is read while the directories are unchanged
+        describe.reads.clear()
+        catalog.profiles()
+        catalog.invalidate()
+        catalog.profiles()
+        assert not describe.reads
+
+        # Only new files are read, and deleted files are dropped
+        write_profile(join(user, "new"), "New")
+        os.remove(join(default, "standard"))
+        catalog.invalidate()
+        assert catalog.find("New") is not None
+        assert catalog.find("Standard") is None
+        assert describe.reads == ["new"]
+
+        # The next session starts from the saved catalog
+        describe.reads.clear()
+        catalog = ProfileCatalog(join(root, "catalog.json"), [user, default], describe)
+        assert catalog.find("New") is not None
+        assert not describe.reads
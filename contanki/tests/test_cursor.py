@@ -0,0 +1,32 @@
+# pylint: disable=missing-docstring
+
+from ..cursor import CURSOR_INTERVAL, STALE_AFTER, CursorIntegrator
+from .test_repeat import Clock, SingleShotTimer
+from . import test
+
+
+@test
+def test_cursor_integrator():
+    clock, timer, moves = Clock(), SingleShotTimer(), []
+    cursor = CursorIntegrator(timer, lambda x, y: moves.append((x, y)), clock)
+    assert timer.delay is None
+    cursor.set_velocity(100.0, -50.0)
+    assert timer.delay == CURSOR_INTERVAL
+    # Fractions of a pixel are carried over to the next tick
+    for _ in range(4):
+        clock.now += 0.008
+        timer.callback()
+    assert sum(x for x, _ in moves) == 3 and sum(y for _, y in moves) == -1
+    assert all(abs(x) <= 1 and abs(y) <= 1 for x, y in moves)
+    cursor.set_velocity(0.0, 0.0)
+    assert timer.delay is None and cursor.remainder == [0.0, 0.0]
+
+
+@test
+def test_cursor_integrator_stale():
+    clock, timer, moves = Clock(), SingleShotTimer(), []
+    cursor = CursorIntegrator(timer, lambda x, y: moves.append((x, y)), clock)
+    cursor.set_velocity(1000.0, 0.0)
+    clock.now = STALE_AFTER * 2
+    timer.callback()
+    assert not moves and timer.delay is None and cursor.velocity == (0.0, 0.0)
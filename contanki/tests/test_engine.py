@@ -0,0 +1,130 @@
+# pylint: disable=missing-docstring
+
+from typing import Sequence
+
+from ..engine import (
+    CONTINUOUS_INTERVAL,
+    Highlight,
+    InputEngine,
+    MoveCursor,
+    Press,
+    QuickSelectClose,
+    QuickSelectDpad,
+    Release,
+    Scroll,
+)
+from ..inputs import InputState
+from ..profile import get_profile
+from . import test
+
+CONFIG = {
+    "Overlays Always On": False,
+    "Cursor Speed": 10,
+    "Cursor Acceleration": 10,
+    "Scroll Speed": 10,
+    "Stick Deadzone": 5,
+}
+
+
+def get_engine() -> InputEngine:
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    engine = InputEngine()
+    engine.set_profile(profile, profile.quick_select)
+    engine.set_config(CONFIG, 0.05)
+    engine.reset(16, 4)
+    return engine
+
+
+def press(*indices: int, axes: Sequence[float] = (0.0,) * 4) -> InputState:
+    return InputState.from_lists([i in indices for i in range(16)], axes)
+
+
+@test
+def test_engine_buttons():
+    engine = get_engine()
+    assert engine.process("question", press(0), False, 0.0) == [Press(0, "Flip Card")]
+    assert engine.process("question", press(0), False, 1.0) == []
+    intents = engine.process("answer", press(), False, 2.0)
+    assert intents == [Release(0, "Good")] and type(intents[0]) is Release
+    # Unbound buttons do nothing
+    assert engine.process("review", press(1), False, 3.0) == []
+    # Nothing happens without focus, and the state isn't changed
+    assert engine.process("NoFocus", press(), False, 4.0) == []
+    assert engine.buttons >> 1 & 1
+
+
+@test
+def test_engine_axes():
+    engine = get_engine()
+    intents = engine.process("review", press(axes=[0.0, 0.5, 0.2, -0.2]), False, 1.0)
+    assert intents == [MoveCursor(0.2, -0.2), Scroll(0.0, 3.125)]
+    # Continuous actions are rate limited, but held inputs keep acting
+    assert engine.heartbeat("review", False, 1.0 + CONTINUOUS_INTERVAL / 2) == []
+    assert engine.heartbeat("review", False, 1.0 + CONTINUOUS_INTERVAL) == intents
+    assert engine.heartbeat("review", True, 2.0) == []
+
+    # Axes in button mode act once when pushed past halfway, and the cursor stops
+    # once its stick is back in the deadzone
+    assert engine.process("review", press(axes=[-0.9, 0, 0, 0]), False, 3.0) == [
+        Press(100, "Back"),
+        MoveCursor(0.0, 0.0),
+        Scroll(0.0, 0.0),
+    ]
+    assert engine.process("review", press(axes=[-0.9, 0, 0, 0]), False, 4.0) == []
+    engine.process("review", press(axes=[0.1, 0, 0, 0]), False, 5.0)
+    assert engine.process("review", press(axes=[0.9, 0, 0, 0]), False, 6.0) == [
+        Press(101, "Forward")
+    ]
+
+    engine.scroll_down = True
+    assert engine.heartbeat("review", False, 7.0)[-1] == Scroll(0.0, 0.003125)
+    # Smooth scrolling is added to the stick's scrolling
+    intents = engine.process("review", press(axes=[0, 0.5, 0, 0]), False, 8.0)
+    assert intents == [Scroll(0.0, 3.125 + 0.003125)]
+    engine.scroll_down = False
+    assert engine.process("review", press(axes=[0, 0, 0, 0]), False, 9.0) == [
+        Scroll(0.0, 0.0)
+    ]
+    assert engine.heartbeat("review", False, 10.0) == []
+
+
+@test
+def test_engine_release_stops():
+    engine = get_engine()
+    intents = engine.process("review", press(axes=[0, 0, 0.2, -0.2]), False, 1.0)
+    assert intents == [MoveCursor(0.2, -0.2)]
+    # Releasing the stick between continuous steps stops the cursor at once
+    released = 1.0 + CONTINUOUS_INTERVAL / 2
+    assert engine.process("review", press(), False, released) == [MoveCursor(0.0, 0.0)]
+    assert engine.heartbeat("review", False, 2.0) == []
+
+    # And scrolling
+    intents = engine.process("review", press(axes=[0, 0.5, 0, 0]), False, 3.0)
+    assert intents == [Scroll(0.0, 3.125)]
+    released = 3.0 + CONTINUOUS_INTERVAL / 2
+    assert engine.process("review", press(), False, released) == [Scroll(0.0, 0.0)]
+
+    # Smooth scrolling stops as soon as it ends, but not while the stick scrolls
+    engine.scroll_down = True
+    assert engine.heartbeat("review", False, 4.0) == [Scroll(0.0, 0.003125)]
+    engine.scroll_down = False
+    assert engine.stop_intents(engine.last_axes) == [Scroll(0.0, 0.0)]
+    engine.process("review", press(axes=[0, 0.5, 0, 0]), False, 5.0)
+    assert engine.stop_intents(engine.last_axes) == []
+
+
+@test
+def test_engine_config_and_quick_select():
+    engine = get_engine()
+    intents = engine.process("config", press(3, axes=[0.9, 0, 0, 0]), False, 1.0)
+    assert intents == [
+        Highlight(3, True),
+        Highlight(200, True),
+        Highlight(101, True),
+        Highlight(100, False),
+    ]
+    intents = engine.process("review", press(12), True, 2.0)
+    assert intents == [QuickSelectDpad((True, False, False, False))]
+    intents = engine.process("review", press(0), True, 3.0)
+    assert type(intents[-1]) is QuickSelectClose and intents[-1].button == 0
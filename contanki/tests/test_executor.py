@@ -0,0 +1,51 @@
+# pylint: disable=missing-docstring
+
+from ..executor import ActionExecutor
+from . import test
+
+
+class Scheduler:
+    def __init__(self):
+        self.scheduled = []
+
+    def __call__(self, func):
+        self.scheduled.append(func)
+
+    def run(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for func in scheduled:
+            func()
+
+
+@test
+def test_executor_defers_actions():
+    scheduler = Scheduler()
+    executor = ActionExecutor(scheduler)
+    calls = []
+    executor.submit("Again", calls.append, ("again",))
+    executor.submit("Good", calls.append, ("good",))
+    assert not calls and len(scheduler.scheduled) == 1
+    scheduler.run()
+    assert calls == ["again", "good"]
+    assert not executor.queue and not executor.scheduled
+    assert executor.stats["Again"].count == 1
+    executor.submit("Again", calls.append, ("again",))
+    assert len(scheduler.scheduled) == 1
+
+
+@test
+def test_executor_errors():
+    scheduler = Scheduler()
+    errors = []
+    executor = ActionExecutor(scheduler, errors.append)
+    calls = []
+
+    def fail():
+        raise ValueError("broken")
+
+    executor.submit("Broken", fail)
+    executor.submit("Good", calls.append, ("good",))
+    scheduler.run()
+    assert isinstance(errors[0], ValueError) and calls == ["good"]
+    assert executor.stats["Broken"].count == 1
+    assert executor.summary()[0].split(":")[0] in ("Broken", "Good")
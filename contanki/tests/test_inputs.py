@@ -0,0 +1,74 @@
+# pylint: disable=missing-docstring
+
+from ..inputs import (
+    AXIS_SCALE,
+    InputState,
+    changed_buttons,
+    pack_inputs,
+    parse_batch,
+    parse_packed_inputs,
+    parse_text_inputs,
+)
+from . import test
+
+
+@test
+def test_parse_text_inputs():
+    buttons, axes = parse_text_inputs("true,false,false", "0.5,-1,0")
+    assert buttons == [True, False, False]
+    assert axes == [0.5, -1.0, 0.0]
+
+
+@test
+def test_parse_packed_inputs():
+    buttons, axes = parse_packed_inputs("5", "9AE=", 4)
+    assert buttons == [True, False, True, False]
+    assert len(axes) == 2
+    assert abs(axes[0] - -12 / AXIS_SCALE) < 1e-9
+    assert axes[1] == 1 / AXIS_SCALE
+
+
+@test
+def test_packed_round_trip():
+    for num_buttons in (1, 18, 30, 50):
+        buttons = [i % 3 == 0 for i in range(num_buttons)]
+        axes = [0.0, 1.0, -1.0, 0.5, -0.25]
+        _buttons, _axes = parse_packed_inputs(*pack_inputs(buttons, axes), num_buttons)
+        assert _buttons == buttons
+        assert len(_axes) == len(axes)
+        for axis, _axis in zip(axes, _axes):
+            assert abs(axis - _axis) <= 0.5 / AXIS_SCALE
+        assert _axes[0] == 0.0
+
+
+@test
+def test_parse_batch():
+    frames = parse_batch("1000.5;0:1;|1008.0;0:0,3:1;1:-0.5,0:0|1016.0;;2:1")
+    assert frames == [
+        (1000.5, [(0, True)], []),
+        (1008.0, [(0, False), (3, True)], [(1, -0.5), (0, 0.0)]),
+        (1016.0, [], [(2, 1.0)]),
+    ]
+
+
+@test
+def test_input_state():
+    inputs = InputState.from_packed("5", "9AE=", 4)
+    assert inputs.button_list() == [True, False, True, False]
+    assert list(inputs.axes) == parse_packed_inputs("5", "9AE=", 4)[1]
+    assert inputs == InputState.from_lists([True, False, True, False], inputs.axes)
+    copy = inputs.copy()
+    inputs.set_button(2, False)
+    inputs.set_button(40, True)
+    inputs.set_axis(3, 0.5)
+    assert inputs.buttons == 1 | 1 << 40 and inputs.num_buttons == 41
+    assert inputs.pressed(40) and not inputs.pressed(2)
+    assert list(inputs.axes)[2:] == [0.0, 0.5]
+    assert copy.pressed(2) and len(copy.axes) == 2
+
+
+@test
+def test_changed_buttons():
+    assert changed_buttons(0b1010, 0b1010) == []
+    assert changed_buttons(0b1010, 0b0110) == [(2, True), (3, False)]
+    assert changed_buttons(0, 1 << 70) == [(70, True)]
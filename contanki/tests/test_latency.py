@@ -0,0 +1,29 @@
+# pylint: disable=missing-docstring
+
+from ..latency import STAGES, Histogram, LatencyMonitor
+from . import test
+
+
+@test
+def test_histogram():
+    hist = Histogram()
+    assert hist.summary() == "no samples"
+    for value in [0.1, 0.3, 0.3, 3.0, -1.0]:
+        hist.record(value)
+    hist.record(10000.0)  # beyond the last bucket
+    assert hist.count == 6 and hist.max == 10000.0
+    assert hist.percentile(0.5) == 0.5
+    assert hist.percentile(0.8) == 4.0
+    assert hist.percentile(1.0) == 10000.0
+    assert "n=6" in hist.summary()
+
+
+@test
+def test_latency_monitor():
+    monitor = LatencyMonitor()
+    monitor.record("bridge", 2.0)
+    lines = monitor.summary()
+    assert len(lines) == len(STAGES)
+    assert lines[0].startswith("bridge: n=1")
+    monitor.reset()
+    assert monitor.summary()[0] == "bridge: no samples"
@@ -0,0 +1,58 @@
+# pylint: disable=missing-docstring
+
+import os
+from os.path import exists, join
+from tempfile import TemporaryDirectory
+from time import monotonic, sleep
+
+from ..persist import BackgroundWriter, write_atomic
+from . import test
+
+
+def read(path: str) -> str:
+    with open(path, "r", encoding="utf8") as file:
+        return file.read()
+
+
+@test
+def test_write_atomic():
+    with TemporaryDirectory() as directory:
+        path = join(directory, "file")
+        write_atomic(path, "one")
+        write_atomic(path, "two")
+        assert read(path) == "two"
+        assert os.listdir(directory) == ["file"]
+
+
+@test
+def test_background_writer():
+    with TemporaryDirectory() as directory:
+        path, other = join(directory, "file"), join(directory, "other")
+        errors = []
+        # Nothing is written until flushed, as the delay is long
+        writer = BackgroundWriter(60, lambda path, err: errors.append(path))
+        writer.write(path, "one")
+        writer.write(path, "two")
+        writer.write(other, "other")
+        assert writer.has_pending() and not exists(path)
+        writer.flush()
+        assert not writer.has_pending()
+        assert read(path) == "two" and read(other) == "other"
+        # The last change wins
+        writer.write(other, "changed")
+        writer.remove(other)
+        writer.remove(join(directory, "missing"))
+        writer.flush()
+        assert not exists(other)
+        writer.write(join(directory, "missing", "file"), "text")
+        writer.flush()
+        assert errors == [join(directory, "missing", "file")]
+
+        # Changes are made in the background after the delay
+        writer = BackgroundWriter(0.01)
+        writer.write(path, "three")
+        deadline = monotonic() + 2
+        while writer.has_pending() and monotonic() < deadline:
+            sleep(0.001)
+        # Changes being made count as pending until they are done
+        assert read(path) == "three"
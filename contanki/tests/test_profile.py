@@ -1,10 +1,11 @@
 # pylint: disable=missing-docstring
 
 from os.path import join
+import json
 import shutil
 
 from ..controller import Controller
-from ..utils import user_files_path, user_profile_path, tests_path
+from ..utils import int_keys, user_files_path, user_profile_path, tests_path
 from . import test
 
 # pylint: disable=unused-import
@@ -18,6 +19,7 @@ from ..profile import (
     rename_profile,
     delete_profile,
     update_assigned_profiles,
+    _writer,
 )
 
 
@@ -54,6 +56,46 @@ def test_delete_profile():
     assert get_profile("test") is None
 
 
+@test
+def test_profile_cache():
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    # Changing a loaded profile doesn't change the next one loaded
+    profile.update_binding("all", 0, "Sync")
+    profile.quick_select["actions"]["review"].append("Sync")
+    fresh = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert fresh is not None and fresh.get("all", 0) != "Sync"
+    assert "Sync" not in fresh.quick_select["actions"]["review"]
+    profile.name = "test"
+    profile.save()
+    assert get_profile("test") == profile
+    # Files changed outside Contanki are read again
+    data = profile.to_dict()
+    data["bindings"]["all"]["0"] = "Undo"
+    with open(join(user_profile_path, "test"), "w", encoding="utf8") as file:
+        json.dump(data, file)
+    loaded = get_profile("test")
+    assert loaded is not None and loaded.get("all", 0) == "Undo"
+    delete_profile("test")
+    assert get_profile("test") is None
+
+
+@test
+def test_profile_list():
+    profiles = get_profile_list()
+    assert "Standard Gamepad (16 Buttons 4 Axes)" in profiles
+    assert "Standard Gamepad (16 Buttons 4 Axes)" not in get_profile_list(
+        defaults=False
+    )
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    profile.name = "test"
+    profile.save()
+    assert "test" in get_profile_list(defaults=False)
+    delete_profile("test")
+    assert "test" not in get_profile_list()
+
+
 @test
 def test_profile_bindings():
     profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
@@ -73,6 +115,26 @@ def test_update_binding():
     assert profile.get("deckBrowser", 0) == "Sync"
 
 
+@test
+def test_dispatch_tables():
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    for state in profile.dispatch_states:
+        for button in range(len(profile.dispatch[state])):
+            assert profile.get(state, button) == profile.resolve(state, button)
+    # Inheritance is updated when a binding changes
+    profile.update_binding("review", 6, "Again")
+    assert profile.get("question", 6) == profile.get("answer", 6) == "Again"
+    profile.update_binding("question", 6, "Undo")
+    profile.remove_binding("review", 6)
+    assert profile.get("question", 6) == "Undo"
+    assert profile.get("answer", 6) == profile.get("all", 6)
+    # Buttons beyond the tables still work
+    profile.update_binding("all", 150, "Sync")
+    assert profile.get("overview", 150) == "Sync"
+    assert profile.get("overview", 300) == ""
+
+
 @test
 def test_save():
     profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
@@ -92,6 +154,40 @@ def test_save():
     delete_profile("Test")
 
 
+@test
+def test_save_unchanged():
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    profile.name = "test"
+    profile.save()
+    assert _writer.has_pending()
+    _writer.flush()
+    # Unchanged profiles aren't written again
+    profile.save()
+    loaded = get_profile("test")
+    assert loaded is not None
+    loaded.save()
+    assert not _writer.has_pending()
+    loaded.update_binding("all", 0, "Sync")
+    loaded.save()
+    assert _writer.has_pending()
+    delete_profile("test")
+    assert get_profile("test") is None
+
+
+@test
+def test_save_after_delete():
+    profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
+    assert profile is not None
+    profile.name = "test"
+    profile.save()
+    # As when a profile is renamed to its own name in the config dialog
+    delete_profile("test")
+    profile.save()
+    assert get_profile("test") is not None
+    delete_profile("test")
+
+
 @test
 def test_copy_profile():
     profile = get_profile("Standard Gamepad (16 Buttons 4 Axes)")
@@ -158,6 +254,19 @@ def test_profile_is_valid():
     assert profile_is_valid("test")
     assert not profile_is_valid("test2")
     delete_profile("test")
+    assert profile_is_valid(profile)
+    data = profile.to_dict()
+    data["controller"] = "Not A Controller"
+    assert not profile_is_valid(data)
+    del data["bindings"]
+    assert not profile_is_valid(data)
+    # Profiles saved with null actions or a float size still load
+    data = profile.to_dict()
+    data["size"] = [float(n) for n in data["size"]]
+    data["bindings"]["all"]["1"] = None
+    assert profile_is_valid(data)
+    loaded = Profile(int_keys(data))
+    assert loaded.len_buttons == profile.len_buttons and loaded.get("all", 1) == ""
 
 toml = """\
 # Contanki Profile
@@ -234,4 +343,15 @@ def test_profile_to_from_toml():
     assert profile.len_axes == 4
     assert profile.controller == Controller("8BitDo Pro")
     assert profile.get("all", 0) == "Enter"
-    assert profile.to_toml() == toml
\ No newline at end of file
+    assert profile.to_toml() == toml
+
+
+@test
+def test_profile_repeat():
+    profile = Profile.from_toml(toml)
+    assert profile is not None and not profile.repeat
+    assert "repeat" not in profile.to_dict()
+    profile.repeat[12] = (250, 60)
+    copy = Profile.from_json(profile.to_json())
+    assert copy is not None and copy.repeat == {12: (250, 60)}
+    assert "[repeat]" in profile.to_toml()
@@ -0,0 +1,65 @@
+# pylint: disable=missing-docstring
+
+from ..repeat import REPEAT_DELAY, REPEAT_INTERVAL, RepeatEngine, get_repeat
+from . import test
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SingleShotTimer:
+    def __init__(self):
+        self.timeout = self
+        self.callback = None
+        self.single_shot = False
+        self.delay = None
+
+    def connect(self, callback):
+        self.callback = callback
+
+    def setSingleShot(self, single_shot):  # pylint: disable=invalid-name
+        self.single_shot = single_shot
+
+    def start(self, delay):
+        self.delay = delay
+
+    def stop(self):
+        self.delay = None
+
+
+@test
+def test_get_repeat():
+    assert get_repeat({}, 3, "Down") == (REPEAT_DELAY, REPEAT_INTERVAL)
+    assert get_repeat({}, 3, "Again") is None
+    assert get_repeat({3: (200, 50)}, 3, "Again") == (200, 50)
+    assert get_repeat({3: (200, 0)}, 3, "Down") is None
+
+
+@test
+def test_repeat_engine():
+    clock, timer, fired = Clock(), SingleShotTimer(), []
+    repeater = RepeatEngine(timer, lambda state, action: fired.append(action), clock)
+    assert timer.single_shot
+    repeater.press(12, "deckBrowser", "Next Deck", 400, 100)
+    assert timer.delay == 400
+    clock.now = 0.4
+    timer.callback()
+    assert fired == ["Next Deck"] and timer.delay == 100
+    repeater.press(13, "deckBrowser", "Down", 50, 100)
+    assert timer.delay == 50
+    # Repeats missed while busy are dropped
+    clock.now = 1.0
+    timer.callback()
+    assert fired == ["Next Deck", "Next Deck", "Down"]
+    assert timer.delay == 100
+    repeater.release(12)
+    repeater.release(13)
+    assert timer.delay is None and not repeater.held
+    repeater.press(12, "deckBrowser", "Next Deck", 400, 100)
+    repeater.clear()
+    assert timer.delay is None
@@ -0,0 +1,164 @@
+# pylint: disable=missing-docstring
+
+import os
+import tempfile
+
+from ..backends import DaemonBackend
+from ..ringbuffer import (
+    CONNECT,
+    DISCONNECT,
+    HEADER,
+    MAX_AXES,
+    RECORD,
+    STATE,
+    InputRecord,
+    RingReader,
+    RingWriter,
+)
+from . import test
+from .test_backends import Recorder
+
+
+def state(buttons: int, *axes: float) -> InputRecord:
+    return InputRecord(0.0, STATE, 17, len(axes), buttons, axes)
+
+
+@test
+def test_ring_buffer():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ring")
+        reader = RingReader(path)
+        assert reader.read() == []  # no writer yet
+
+        writer = RingWriter(path, capacity=4)
+        assert reader.read() == []
+        writer.write(InputRecord(1.0, CONNECT, 17, 4, 0, (), "Test Controller"))
+        writer.write(state(0b101, 0.5, -1.0, 0.0, 0.0))
+        connect, record = reader.read()
+        assert connect.name == "Test Controller"
+        assert record.button_list()[:4] == [True, False, True, False]
+        assert record.axis_list() == [0.5, -1.0, 0.0, 0.0]
+        assert reader.read() == []
+
+        # The writer laps the reader, which skips the overwritten records
+        for i in range(6):
+            writer.write(state(i))
+        assert [record.buttons for record in reader.read()] == [3, 4, 5]
+        assert reader.dropped == 3
+
+        # A reader which starts late gets the controller and its latest state
+        late = RingReader(path)
+        connect, record = late.read()
+        assert connect.kind == CONNECT and connect.num_buttons == 17
+        assert record.buttons == 5
+
+        # A restarted writer is picked up
+        writer.close()
+        writer = RingWriter(path, capacity=4)
+        writer.write(InputRecord(2.0, DISCONNECT, 0, 0, 0, ()))
+        assert [record.kind for record in reader.read()] == [DISCONNECT]
+        assert RingReader(path).read() == []
+        writer.close()
+        reader.close()
+        late.close()
+
+
+@test
+def test_ring_buffer_torn_records():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ring")
+        writer = RingWriter(path, capacity=4)
+        reader = RingReader(path)
+        assert reader.read() == []
+        for i in range(4):
+            writer.write(state(i))
+        # The writer is part way through the next record, in the first record's slot
+        torn = RECORD.pack(9.0, STATE, 17, 0, 9, *(0.0,) * MAX_AXES, b"")
+        writer.map[HEADER.size : HEADER.size + 8] = torn[:8]
+        assert [record.buttons for record in reader.read()] == [1, 2, 3]
+        assert reader.dropped == 1
+
+        # Records overwritten while being read are dropped, including the one which
+        # may be part way through being written
+        for i in range(4, 7):
+            writer.write(state(i))
+        read_record = reader.read_record
+
+        def read_while_writing(index: int) -> InputRecord:
+            if index == 4:
+                writer.write(state(7))
+                writer.write(state(8))
+            return read_record(index)
+
+        reader.read_record = read_while_writing  # type: ignore
+        assert [record.buttons for record in reader.read()] == [6]
+        assert reader.dropped == 3
+        writer.close()
+        reader.close()
+
+
+class FakeTimer:
+    def __init__(self):
+        self.timeout = self
+        self.callback = None
+        self.running = False
+        self._interval = 0
+
+    def connect(self, callback):
+        self.callback = callback
+
+    def start(self, interval):
+        self.running = True
+        self._interval = interval
+
+    def stop(self):
+        self.running = False
+
+    def setInterval(self, interval):  # pylint: disable=invalid-name
+        self._interval = interval
+
+    def interval(self):
+        return self._interval
+
+
+@test
+def test_daemon_backend():
+    config = {"Active Poll Interval": 8, "Idle Poll Interval": 100, "Idle Delay": 0}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ring")
+        writer = RingWriter(path)
+        target, timer = Recorder(), FakeTimer()
+        backend = DaemonBackend(target, timer, path)
+        backend.update_config(config)
+        backend.start()
+        assert timer.running and timer.interval() == 100
+        timer.callback()
+        assert target.calls == []
+
+        writer.write(InputRecord(1.0, CONNECT, 17, 4, 0, (), "Test Controller"))
+        writer.write(state(1, 0.0, 0.0, 0.0, 0.0))
+        writer.write(state(0, 0.0, 0.0, 0.0, 0.0))
+        timer.callback()
+        names = [name for name, _ in target.calls]
+        assert names == ["on_connect", "poll_inputs", "poll_inputs"]
+        assert target.calls[0][1] == (17, 4, "Test Controller")
+        assert target.calls[1][1][0][0] and not target.calls[2][1][0][0]
+        assert timer.interval() == 100
+
+        # Held inputs keep acting, and poll faster
+        writer.write(state(0, 1.0, 0.0, 0.0, 0.0))
+        timer.callback()
+        assert timer.interval() == 8
+        backend.last_action = 0.0
+        timer.callback()
+        assert target.calls[-1][0] == "heartbeat"
+
+        info = []
+        backend.get_controller_info(info.extend)
+        assert info == [["Test Controller", "17", "4"]]
+
+        writer.write(InputRecord(2.0, DISCONNECT, 0, 0, 0, ()))
+        timer.callback()
+        assert target.calls[-1][0] == "on_disconnect"
+        backend.stop()
+        writer.close()
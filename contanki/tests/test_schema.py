@@ -0,0 +1,70 @@
+# pylint: disable=missing-docstring
+
+import json
+import os
+from os.path import join
+
+from ..schema import ValidationError, validate_profile
+from ..utils import default_profile_path
+from . import test
+
+CONTROLLERS = {"DualShock 4", "Xbox 360"}
+
+
+def profile() -> dict:
+    return {
+        "name": "Test",
+        "size": [18, 4],
+        "controller": "DualShock 4",
+        "quick_select": {
+            "actions": {"review": ["Bury Card"]},
+            "Select with Stick": True,
+        },
+        "bindings": {"all": {"0": "Enter", 100: "Back"}, "review": {}},
+        "axes_bindings": {"0": "Buttons", "1": "Scroll Vertical"},
+        "invert_axis": {"0": False, "1": True},
+        "repeat": {"12": [250, 60]},
+    }
+
+
+@test
+def test_validate_profile():
+    assert validate_profile(profile(), CONTROLLERS) == []
+    for file in os.listdir(default_profile_path):
+        with open(join(default_profile_path, file), "r", encoding="utf8") as f:
+            assert validate_profile(json.load(f)) == [], file
+
+    # Profiles which older versions accepted are still valid
+    valid = profile()
+    valid["size"] = [18.0, 4.0]
+    valid["bindings"]["all"]["1"] = None
+    assert validate_profile(valid, CONTROLLERS) == []
+
+    invalid = profile()
+    del invalid["name"]
+    invalid["size"] = [18.5, 4]
+    invalid["bindings"]["Review"] = {}
+    invalid["bindings"]["all"]["A"] = "Enter"
+    invalid["axes_bindings"]["1"] = None
+    invalid["invert_axis"]["0"] = 0
+    assert [error.path for error in validate_profile(invalid, CONTROLLERS)] == [
+        ("name",),
+        ("size", 0),
+        ("bindings", "all", "A"),
+        ("bindings", "Review"),
+        ("axes_bindings", "1"),
+        ("invert_axis", "0"),
+    ]
+
+    invalid = profile()
+    invalid["controller"] = "Not A Controller"
+    assert validate_profile(invalid) == []
+    errors = validate_profile(invalid, CONTROLLERS)
+    assert errors == [
+        ValidationError(("controller",), "unknown controller 'Not A Controller'")
+    ]
+    assert str(errors[0]) == "controller: unknown controller 'Not A Controller'"
+
+    invalid["bindings"] = {}
+    assert str(validate_profile(invalid)[0]) == "bindings: expected at least one entry"
+    assert validate_profile([]) == [ValidationError((), "expected a table, got list")]
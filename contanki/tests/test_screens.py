@@ -0,0 +1,21 @@
+# pylint: disable=missing-docstring
+
+from ..screens import ScreenTopology
+from . import test
+
+
+@test
+def test_screen_topology():
+    topology = ScreenTopology([(0, 0, 1920, 1080), (1920, 0, 1280, 1024)])
+    assert topology.screen_at(100, 100) == (0, 0, 1920, 1080)
+    assert topology.screen_at(2000, 100) == (1920, 0, 1280, 1024)
+    assert topology.last == 1
+    assert topology.screen_at(2000, 1050) is None
+    # Moving onto another screen
+    assert topology.move(1910, 500, 20, 0) == (1930, 500)
+    # Moving off every screen keeps the cursor on the screen it was on
+    assert topology.move(1930, 1000, 0, 50) == (1930, 1023)
+    assert topology.move(10, 10, -20, -20) == (0, 0)
+    assert topology.move(-5, -5, 10, 10) is None
+    topology.set_screens([])
+    assert topology.move(10, 10, 1, 1) is None
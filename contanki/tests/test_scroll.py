@@ -0,0 +1,27 @@
+# pylint: disable=missing-docstring
+
+from ..scroll import KEEP_ALIVE, SmoothScroller
+from .test_repeat import Clock
+from . import test
+
+
+@test
+def test_smooth_scroller():
+    clock, sent = Clock(), []
+    scroller = SmoothScroller(sent.append, clock)
+    scroller.stop()
+    assert not sent
+    scroller.set_velocity(0.0, 100.0)
+    assert sent == ["window.contankiScroll && contankiScroll.set(0, 100)"]
+    # Small changes aren't sent until the velocity needs refreshing
+    scroller.set_velocity(0.0, 105.0)
+    assert len(sent) == 1
+    scroller.set_velocity(0.0, 150.0)
+    assert len(sent) == 2 and sent[-1].endswith("set(0, 150)")
+    clock.now += KEEP_ALIVE
+    scroller.set_velocity(0.0, 150.0)
+    assert len(sent) == 3
+    scroller.stop()
+    assert sent[-1].endswith("set(0, 0)")
+    scroller.stop()
+    assert len(sent) == 4
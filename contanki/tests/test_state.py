@@ -0,0 +1,46 @@
+# pylint: disable=missing-docstring
+
+from ..state import StateTracker
+from . import test
+
+
+@test
+def test_state_main_window():
+    tracker = StateTracker()
+    assert tracker.state == "NoFocus"
+    tracker.sync("MainWindow", "deckBrowser", None)
+    assert tracker.state == "deckBrowser"
+    tracker.set_main_state("overview")
+    assert tracker.state == "overview"
+    tracker.set_main_state("review")
+    assert tracker.state == "question"
+    tracker.set_reviewer_state("answer")
+    assert tracker.state == "answer"
+    tracker.set_reviewer_state("transition")
+    assert tracker.state == "transition"
+    tracker.set_reviewer_state("question")
+    assert tracker.state == "question"
+    tracker.set_main_state("deckBrowser")
+    assert tracker.state == "deckBrowser"
+
+
+@test
+def test_state_focus():
+    tracker = StateTracker()
+    tracker.sync("MainWindow", "review", "answer")
+    assert tracker.state == "answer"
+    tracker.set_window("Preferences")
+    assert tracker.state == "dialog"
+    tracker.set_window("Contanki Options")
+    assert tracker.state == "config"
+    tracker.set_window("Browser")
+    assert tracker.state == "NoFocus"
+    tracker.set_window(None)
+    assert tracker.state == "NoFocus"
+
+    # Changes while another window has focus apply when the main window regains it
+    tracker.set_reviewer_state("question")
+    tracker.set_main_state("overview")
+    assert tracker.state == "NoFocus"
+    tracker.set_window("MainWindow")
+    assert tracker.state == "overview"
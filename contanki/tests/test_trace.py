@@ -0,0 +1,72 @@
+# pylint: disable=missing-docstring
+
+import gzip
+import os
+import tempfile
+
+from ..trace import TraceRecorder, TraceReplayer, read_trace
+from . import test
+
+
+@test
+def test_trace_round_trip():
+    times = iter([10.0, 10.0, 10.0125, 10.5])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "test.ctrace")
+        recorder = TraceRecorder(path, clock=lambda: next(times))
+        recorder.record("contanki::on_connect::17::4::Test Controller")
+        recorder.record("contanki::packed::5::AAAAAA==")
+        recorder.record("contanki::batch::1.0;0:0;|2.0;;1:-0.5")
+        recorder.close()
+        trace = read_trace(path)
+    assert [time for time, _ in trace] == [0.0, 12.5, 500.0]
+    assert trace[2][1] == "contanki::batch::1.0;0:0;|2.0;;1:-0.5"
+    assert recorder.count == 3
+
+
+@test
+def test_read_damaged_trace():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "test.ctrace")
+        recorder = TraceRecorder(path, clock=lambda: 0.0)
+        recorder.record("contanki::packed::5::AAAAAA==")
+        recorder.close()
+        with open(path, "rb") as file:
+            data = file.read()
+        with gzip.open(path, "wt", encoding="utf8") as file:
+            file.write("contanki-trace 1\n0.0\tmessage\nnot a line\n")
+        try:
+            read_trace(path)
+        except ValueError as err:
+            assert "line 3" in str(err)
+        else:
+            assert False, "Malformed line was read"
+        for damaged in (data[: len(data) // 2], b"not gzip"):
+            with open(path, "wb") as file:
+                file.write(damaged)
+            try:
+                read_trace(path)
+            except (OSError, ValueError):
+                pass
+            else:
+                assert False, "Damaged trace was read"
+
+
+@test
+def test_trace_replay():
+    trace = [(0.0, "a"), (0.0, "b"), (20.0, "c")]
+    sent = []
+    finished = []
+    TraceReplayer(trace, sent.append, on_finished=lambda: finished.append(1)).run_fast()
+    assert sent == ["a", "b", "c"] and finished
+
+    sent.clear()
+    scheduled = []
+    replayer = TraceReplayer(trace, sent.append, lambda *args: scheduled.append(args))
+    replayer.start_realtime()
+    assert sent == ["a", "b"]
+    delay, callback = scheduled[-1]
+    assert 0 <= delay <= 20
+    replayer.start -= 1  # pretend the delay has passed
+    callback()
+    assert sent == ["a", "b", "c"] and not replayer.running
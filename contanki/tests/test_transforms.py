@@ -0,0 +1,55 @@
+# pylint: disable=missing-docstring
+
+from ..controller import Controller
+from ..inputs import InputState
+from ..transforms import compile_transforms
+from . import test
+
+
+@test
+def test_no_transforms():
+    assert compile_transforms([]) is None
+    assert compile_transforms(Controller("DualShock 4").transforms) is None
+    try:
+        compile_transforms([{"type": "unknown"}])
+    except ValueError:
+        pass
+    else:
+        assert False, "Unknown transforms should raise ValueError"
+
+
+@test
+def test_axes_to_dpad():
+    transform = compile_transforms(Controller("8BitDo Zero (X Input)").transforms)
+    assert transform is not None
+    inputs = InputState(0, 16, [0.0, -1.0, 1.0, 0.0])
+    transform(inputs)
+    assert inputs.button_list()[12:16] == [True, False, False, True]
+    # The d-pad buttons are left alone when the controller reports them
+    inputs = InputState(1 << 13, 16, [1.0, 0.0, 0.0, 0.0])
+    transform(inputs)
+    assert inputs.button_list()[12:16] == [False, True, False, False]
+
+
+@test
+def test_merge_axes():
+    transform = compile_transforms(Controller("8BitDo Zero (D Input)").transforms)
+    assert transform is not None
+    inputs = InputState(0, 8, [0.0, 0.5, -1.0, 0.0, 0.0, 1.0])
+    transform(inputs)
+    assert list(inputs.axes) == [-1.0, 0.5, -1.0, 0.0, 0.0, 1.0]
+    # Controllers reporting fewer axes aren't indexed out of range
+    inputs = InputState(0, 8, [0.0, 0.0])
+    transform(inputs)
+    assert list(inputs.axes) == [0.0, 0.0]
+
+
+@test
+def test_remap_buttons():
+    transform = compile_transforms(
+        [{"type": "remap_buttons", "map": {0: 1, 1: 0, 2: 5}}]
+    )
+    assert transform is not None
+    inputs = InputState.from_lists([True, False, True, False, False, False], [])
+    transform(inputs)
+    assert inputs.button_list() == [False, True, False, False, False, True]
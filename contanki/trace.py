@@ -0,0 +1,122 @@
+"""
+Records the messages sent by controller.js to a trace file, and replays them, so
+that problems can be reproduced and the input path benchmarked deterministically.
+"""
+
+# For ease of testing, this file should not import from outside the standard library.
+
+from __future__ import annotations
+
+import gzip
+from time import monotonic
+from typing import Callable
+
+TRACE_HEADER = "contanki-trace 1"
+
+Trace = list[tuple[float, str]]
+
+
+class TraceRecorder:
+    """Writes messages, with the time in ms since recording started, to a gzipped
+    text file with one message per line."""
+
+    def __init__(self, path: str, clock: Callable[[], float] = monotonic) -> None:
+        self.path = path
+        self.clock = clock
+        self.start = clock()
+        self.count = 0
+        self.file = gzip.open(path, "wt", encoding="utf8")
+        self.file.write(TRACE_HEADER + "\n")
+
+    def record(self, message: str) -> None:
+        """Records a message."""
+        self.file.write(f"{(self.clock() - self.start) * 1000:.1f}\t{message}\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Finishes the trace."""
+        self.file.close()
+
+
+def read_trace(path: str) -> Trace:
+    """Returns the time in ms and the message of each line of a trace file. Raises
+    OSError if the file can't be read, or ValueError if it isn't a complete trace."""
+    try:
+        with gzip.open(path, "rt", encoding="utf8") as file:
+            if file.readline().rstrip("\n") != TRACE_HEADER:
+                raise ValueError(f"{path} is not a Contanki trace")
+            trace = []
+            for number, line in enumerate(file, 2):
+                try:
+                    time, message = line.rstrip("\n").split("\t", 1)
+                    trace.append((float(time), message))
+                except ValueError as err:
+                    raise ValueError(f"{path}, line {number} is malformed") from err
+    except EOFError as err:
+        raise ValueError(f"{path} is truncated") from err
+    return trace
+
+
+class TraceReplayer:
+    """
+    Passes the messages of a trace to send. Replaying at the original speed needs
+    schedule, which must call a function after a delay in ms on the main thread.
+    """
+
+    def __init__(
+        self,
+        trace: Trace,
+        send: Callable[[str], None],
+        schedule: Callable[[int, Callable[[], None]], None] | None = None,
+        on_finished: Callable[[], None] | None = None,
+    ) -> None:
+        self.trace = trace
+        self.send = send
+        self.schedule = schedule
+        self.on_finished = on_finished
+        self.index = 0
+        self.start = 0.0
+        self.running = False
+
+    def run_fast(self) -> float:
+        """Replays the whole trace immediately. Returns the time taken in seconds."""
+        start = monotonic()
+        self.running = True
+        for _, message in self.trace:
+            self.send(message)
+        self.running = False
+        elapsed = monotonic() - start
+        if self.on_finished is not None:
+            self.on_finished()
+        return elapsed
+
+    def start_realtime(self) -> None:
+        """Replays the trace with the delays between messages it was recorded with."""
+        if self.schedule is None:
+            raise ValueError("Replaying in real time requires schedule")
+        self.index = 0
+        self.start = monotonic()
+        self.running = True
+        self.replay_due()
+
+    def stop(self) -> None:
+        """Stops a real time replay."""
+        self.running = False
+
+    def replay_due(self) -> None:
+        """Sends the messages which are due, then waits for the next one."""
+        if not self.running:
+            return
+        # Times are measured from the start, so that late timers don't add up
+        elapsed = (monotonic() - self.start) * 1000
+        while self.index < len(self.trace) and self.trace[self.index][0] <= elapsed:
+            self.send(self.trace[self.index][1])
+            self.index += 1
+        if self.index >= len(self.trace):
+            self.running = False
+            if self.on_finished is not None:
+                self.on_finished()
+            return
+        assert self.schedule is not None
+        delay = max(0, int(self.trace[self.index][0] - elapsed))
+        self.schedule(delay, self.replay_due)
@@ -0,0 +1,102 @@
+"""
+Compiles the input transforms declared by a controller in controllers.json, which fix
+controllers that report their inputs oddly, into a single function. Transforms are
+listed under "transforms", and applied in order:
+
+- axes_to_dpad: while no d-pad button is pressed, presses the d-pad "buttons" (up,
+  down, left, right) from the "horizontal" and "vertical" axes, e.g. for controllers
+  which report their d-pad as a stick in some modes.
+- merge_axes: sets the "target" axis to the first of the "sources" axes which is
+  deflected, if the target isn't.
+- remap_buttons: moves the buttons in "map" from the key to the value.
+"""
+
+# For ease of testing, this file should not import any Anki modules.
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from .inputs import InputState
+
+Transform = Callable[[InputState], None]
+
+
+def axes_to_dpad(spec: dict[str, Any]) -> Transform:
+    """Compiles an axes_to_dpad transform."""
+    up, down, left, right = spec["buttons"]
+    horizontal, vertical = spec["horizontal"], spec["vertical"]
+    threshold = spec.get("threshold", 0.5)
+    dpad_mask = (1 << up) | (1 << down) | (1 << left) | (1 << right)
+
+    def transform(inputs: InputState) -> None:
+        axes = inputs.axes
+        if inputs.buttons & dpad_mask or not any(axes):
+            return
+        horizontal_axes = [axes[i] for i in horizontal if i < len(axes)]
+        vertical_axes = [axes[i] for i in vertical if i < len(axes)]
+        inputs.set_button(up, any(value < -threshold for value in vertical_axes))
+        inputs.set_button(down, any(value > threshold for value in vertical_axes))
+        inputs.set_button(left, any(value < -threshold for value in horizontal_axes))
+        inputs.set_button(right, any(value > threshold for value in horizontal_axes))
+
+    return transform
+
+
+def merge_axes(spec: dict[str, Any]) -> Transform:
+    """Compiles a merge_axes transform."""
+    target, sources = spec["target"], spec["sources"]
+
+    def transform(inputs: InputState) -> None:
+        axes = inputs.axes
+        if target >= len(axes) or axes[target]:
+            return
+        for source in sources:
+            if source < len(axes) and axes[source]:
+                axes[target] = axes[source]
+                return
+
+    return transform
+
+
+def remap_buttons(spec: dict[str, Any]) -> Transform:
+    """Compiles a remap_buttons transform."""
+    mapping = [(int(source), int(target)) for source, target in spec["map"].items()]
+    cleared = {source for source, _ in mapping} - {target for _, target in mapping}
+
+    def transform(inputs: InputState) -> None:
+        values = [(target, inputs.pressed(source)) for source, target in mapping]
+        for source in cleared:
+            inputs.set_button(source, False)
+        for target, value in values:
+            inputs.set_button(target, value)
+
+    return transform
+
+
+TRANSFORMS: dict[str, Callable[[dict[str, Any]], Transform]] = {
+    "axes_to_dpad": axes_to_dpad,
+    "merge_axes": merge_axes,
+    "remap_buttons": remap_buttons,
+}
+
+
+def compile_transforms(specs: list[dict[str, Any]]) -> Transform | None:
+    """Compiles transforms into one function which changes an InputState in place,
+    or returns None if there are none, so that most controllers cost nothing.
+    Raises ValueError for an unknown transform."""
+    transforms = []
+    for spec in specs:
+        if spec.get("type") not in TRANSFORMS:
+            raise ValueError(f"Unknown controller transform: {spec.get('type')}")
+        transforms.append(TRANSFORMS[spec["type"]](spec))
+    if not transforms:
+        return None
+    if len(transforms) == 1:
+        return transforms[0]
+
+    def transform(inputs: InputState) -> None:
+        for _transform in transforms:
+            _transform(inputs)
+
+    return transform
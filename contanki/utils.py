@@ -19,6 +19,7 @@ tests_path = join(addon_path, "tests")
 user_files_path = join(addon_path, "user_files")
 user_profile_path = join(user_files_path, "profiles")
 user_controllers_path = join(user_files_path, "custom_controllers")
+user_traces_path = join(user_files_path, "traces")
 default_profile_path = join(addon_path, "profiles")
 controllers_path = join(addon_path, "controllers")
 